@@ -1,10 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional, Union
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
 import uvicorn
 
+from obsidian_debrief import config
+from obsidian_debrief.actions import ActionExecutor, AnyLLMAction, LLMAction
+from obsidian_debrief.journal import ActionJournal, BatchApplyError, JournalBatch
+from obsidian_debrief.utils.files import TaskPriority
+from obsidian_debrief.utils.index import local_naive
+from obsidian_debrief.utils.project import ProjectLoader
+
 class TaskType(str, Enum):
     UPDATE = "update"
     CREATE = "create"
@@ -21,6 +30,7 @@ class TaskCreate(TaskBase):
 class Task(TaskBase):
     id: int
     created_at: datetime = Field(default_factory=datetime.now)
+    action: Optional[AnyLLMAction] = None
 
 
 class DebirefUpdate(BaseModel):
@@ -33,6 +43,13 @@ class DebirefResponse(BaseModel):
     summary: str
     processed_at: datetime = Field(default_factory=datetime.now)
 
+class VaultTask(BaseModel):
+    project: str
+    content: str
+    priority: Optional[TaskPriority] = None
+    due_date: Optional[datetime] = None
+    tags: List[str] = Field(default_factory=list)
+
 class TaskBatchResponse(BaseModel):
     success: bool
     message: str
@@ -48,6 +65,55 @@ app = FastAPI(
 tasks_db = []
 task_counter = 0
 
+_journal: Optional[ActionJournal] = None
+_loader: Optional[ProjectLoader] = None
+
+def get_loader() -> ProjectLoader:
+    global _loader
+    if _loader is None:
+        _loader = ProjectLoader(config.VAULT_PATH)
+        _loader.load_all_projects()
+    return _loader
+
+def _on_batch_applied(batch: JournalBatch) -> None:
+    # Keep the loaded projects and task index in step with applied edits
+    if _loader is not None:
+        _loader.apply_edits(batch.edits)
+
+def get_journal() -> ActionJournal:
+    global _journal
+    if _journal is None:
+        _journal = ActionJournal(
+            ActionExecutor(config.VAULT_PATH), on_apply=_on_batch_applied
+        )
+    return _journal
+
+@app.on_event("startup")
+async def recover_journal():
+    """
+    Finish (or report conflicts for) any batches a crash left half-applied.
+    """
+    if Path(config.VAULT_PATH).exists():
+        await run_in_threadpool(get_journal().recover)
+
+async def commit_actions(
+    actions: List[LLMAction], background_tasks: BackgroundTasks
+) -> Optional[JournalBatch]:
+    """
+    Durably journal the actions; the vault files are written after the response.
+    """
+    if not actions:
+        return None
+    journal = get_journal()
+    try:
+        batch = await run_in_threadpool(journal.commit, actions)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except BatchApplyError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    background_tasks.add_task(journal.apply, batch)
+    return batch
+
 @app.post("/api/debrief", response_model=DebirefResponse)
 async def process_debrief(update: DebirefUpdate):
     """
@@ -92,12 +158,51 @@ async def process_debrief(update: DebirefUpdate):
         processed_at=datetime.now()
     )
 
-@app.get("/api/tasks", response_model=List[Task])
-async def get_tasks():
+@app.get("/api/tasks", response_model=Union[List[Task], List[VaultTask]])
+async def get_tasks(
+    overdue: bool = False,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    due_within_days: Annotated[Optional[int], Query(ge=0)] = None,
+    priority: Annotated[Optional[List[TaskPriority]], Query()] = None,
+    project: Annotated[Optional[List[str]], Query()] = None,
+):
     """
     Retrieve all pending tasks.
+
+    With any vault query parameter set, return pending vault tasks from the due-date
+    index instead, earliest due first: overdue, due in [due_after, due_before), or
+    due from today through the next due_within_days days, optionally filtered by
+    priority and project. Dates with a timezone are converted to server local time.
     """
-    return tasks_db
+    filters = (due_after, due_before, due_within_days, priority, project)
+    if not overdue and all(f is None for f in filters):
+        return tasks_db
+
+    due_after = local_naive(due_after) if due_after else None
+    due_before = local_naive(due_before) if due_before else None
+
+    loader = await run_in_threadpool(get_loader)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if overdue:
+        due_before = min(due_before, today) if due_before else today
+    if due_within_days is not None:
+        due_after = max(due_after, today) if due_after else today
+        window_end = today + timedelta(days=due_within_days + 1)
+        due_before = min(due_before, window_end) if due_before else window_end
+
+    return [
+        VaultTask(
+            project=project_name,
+            content=task.content,
+            priority=task.priority,
+            due_date=task.due_date,
+            tags=task.tags,
+        )
+        for project_name, task in loader.tasks_due_between(
+            due_after, due_before, priority, project
+        )
+    ]
 
 @app.delete("/api/tasks/{task_id}")
 async def delete_task(task_id: int):
@@ -114,7 +219,7 @@ async def delete_task(task_id: int):
     return {"success": True, "message": "Task deleted"}
 
 @app.post("/api/tasks/{task_id}/confirm")
-async def confirm_task(task_id: int):
+async def confirm_task(task_id: int, background_tasks: BackgroundTasks):
     """
     Confirm and process a specific task.
     """
@@ -122,12 +227,9 @@ async def confirm_task(task_id: int):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Process the task based on its type
-    # In a real implementation, this would:
-    # 1. Create new files for CREATE tasks
-    # 2. Update existing files for UPDATE tasks
-    # 3. Mark tasks as complete for COMPLETE tasks
-    # 4. Add new tasks for NEW tasks
+    # Tasks carrying a vault action are journaled; the file is edited after we respond
+    if task.action is not None:
+        await commit_actions([task.action], background_tasks)
     
     # Remove the task after processing
     tasks_db.remove(task)
@@ -135,7 +237,7 @@ async def confirm_task(task_id: int):
     return {"success": True, "message": f"Task processed: {task.content}"}
 
 @app.post("/api/tasks/confirm-all", response_model=TaskBatchResponse)
-async def confirm_all_tasks():
+async def confirm_all_tasks(background_tasks: BackgroundTasks):
     """
     Confirm and process all pending tasks.
     """
@@ -149,8 +251,9 @@ async def confirm_all_tasks():
             processed_count=0
         )
     
-    # Process all tasks
-    # In a real implementation, this would process each task based on its type
+    # Commit every action as one journal batch (a single fsync); files are written later
+    actions = [task.action for task in tasks_db if task.action is not None]
+    await commit_actions(actions, background_tasks)
     
     # Clear all tasks
     tasks_db = []
@@ -0,0 +1,156 @@
+"""Compare verbose and compact LLM output formats.
+
+Offline mode serializes the SYSTEM_PROMPT example actions both ways, with the same
+JSON separators and with and without reasoning, and reports their size in
+characters; token counts depend on the served model's tokenizer.
+With --live each request is sent to the configured DEBRIEF_LLM_* endpoints in both
+formats, recording completion tokens (from the server's usage report) and wall
+time per debrief.
+
+    python extras/compact_benchmark.py
+    python extras/compact_benchmark.py --live --vault ~/Sync/HomeVault --runs 3
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from obsidian_debrief.actions import (
+    AddTaskAction,
+    CompleteTaskAction,
+    LLMAction,
+    UpdateSummaryAction,
+)
+from obsidian_debrief.prompts.system import COMPACT_SYSTEM_PROMPT, SYSTEM_PROMPT
+from obsidian_debrief.utils.compact import compress_action
+from obsidian_debrief.utils.llm import validate_llm_response
+from obsidian_debrief.utils.routing import EndpointPool
+
+REQUESTS = [
+    "Add a high priority task to review the API documentation, due next week, "
+    "add it to the Development/Tasks.md file",
+    "Mark the task 'Initial research' as complete in Research/Planning.md",
+    "Update the main project file Projects/API-Integration.md with a summary of "
+    "our progress this week",
+    "Add a new section called 'Dependencies' to the Technical-Specs.md file",
+]
+
+EXAMPLE_ACTIONS: List[LLMAction] = [
+    AddTaskAction(
+        action_data={
+            "content": "Research API documentation",
+            "priority": "🔼",
+            "due_date": "2024-04-01",
+            "tags": ["task", "research"],
+            "file_path": "Development/API-Integration.md",
+            "section": "Research Phase",
+        },
+        reasoning="New requirement identified during planning meeting",
+    ),
+    UpdateSummaryAction(
+        action_data={
+            "content": "Sprint 3 Progress: Completed API integration...",
+            "file_path": "Projects/API-Project.md",
+        },
+        reasoning="Weekly sprint summary update",
+    ),
+    CompleteTaskAction(
+        action_data={
+            "file_path": "Tasks/Sprint-3.md",
+            "task_content": "Research API documentation",
+            "completion_date": "2024-03-21T15:30:00",
+        },
+        reasoning="Task deliverables have been completed and reviewed",
+    ),
+]
+
+
+def _chars_per_action(items: List[Dict[str, Any]]) -> float:
+    # Same separators for both formats so only keys, codes and reasoning differ
+    text = json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+    return len(text) / len(items)
+
+
+def offline_report() -> None:
+    for include_reasoning in (True, False):
+        verbose = []
+        for action in EXAMPLE_ACTIONS:
+            item = action.model_dump(mode="json", exclude_defaults=True)
+            if not include_reasoning:
+                item.pop("reasoning", None)
+            verbose.append(item)
+        compact = [
+            compress_action(action, include_reasoning=include_reasoning)
+            for action in EXAMPLE_ACTIONS
+        ]
+        label = "with" if include_reasoning else "without"
+        verbose_chars = _chars_per_action(verbose)
+        compact_chars = _chars_per_action(compact)
+        print(
+            f"{label:7} reasoning: verbose chars/action={verbose_chars:6.1f} "
+            f"compact chars/action={compact_chars:6.1f}"
+        )
+
+
+def live_report(vault_context: str, runs: int) -> None:
+    pool = EndpointPool.from_config()
+    formats = {"verbose": SYSTEM_PROMPT, "compact": COMPACT_SYSTEM_PROMPT}
+    results: Dict[str, Dict[str, List[float]]] = {
+        name: {"tokens": [], "seconds": [], "failures": []} for name in formats
+    }
+
+    for _ in range(runs):
+        for request in REQUESTS:
+            for name, prompt in formats.items():
+                start = time.perf_counter()
+                response = pool.create(
+                    messages=[
+                        {"role": "system", "content": prompt},
+                        {
+                            "role": "user",
+                            "content": f"Vault Context:\n{vault_context}\n\n"
+                            f"User Request: {request}",
+                        },
+                    ],
+                    max_tokens=2000,
+                    temperature=0.7,
+                )
+                elapsed = time.perf_counter() - start
+                try:
+                    validate_llm_response(
+                        response.choices[0].message.content, compact=name == "compact"
+                    )
+                except ValueError:
+                    results[name]["failures"].append(1)
+                results[name]["seconds"].append(elapsed)
+                if response.usage:
+                    results[name]["tokens"].append(response.usage.completion_tokens)
+
+    for name, result in results.items():
+        tokens = statistics.mean(result["tokens"]) if result["tokens"] else float("nan")
+        print(
+            f"{name:8} completion_tokens/debrief={tokens:7.1f} "
+            f"seconds/debrief={statistics.mean(result['seconds']):6.2f} "
+            f"invalid={len(result['failures'])}/{len(result['seconds'])}"
+        )
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--live", action="store_true", help="Query the configured endpoints"
+    )
+    parser.add_argument("--vault", help="Vault path used to build the request context")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    offline_report()
+    if args.live:
+        vault_context = ""
+        if args.vault:
+            from obsidian_debrief.analyze import build_vault_context
+
+            vault_context = build_vault_context(args.vault)
+        live_report(vault_context, args.runs)
@@ -1,8 +1,14 @@
+import hashlib
+import os
+import re
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Union
+from pathlib import Path
+from typing import Annotated, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+
+from obsidian_debrief.utils.project import parse_task_line
 
 
 class ActionType(str, Enum):
@@ -10,7 +16,8 @@ class ActionType(str, Enum):
     ADD_TASK = "add_task"
     COMPLETE_TASK = "complete_task"
     UPDATE_TASK = "update_task"
-    ADD_SECTION = "add_section
+    ADD_SECTION = "add_section"
+
 class Priority(str, Enum):
     HIGHEST = "⏫"
     HIGH = "🔼"
@@ -48,38 +55,373 @@ class LLMAction(BaseModel):
     action_data: Union[TaskUpdate, SummaryUpdate, TaskCompletion, SectionAddition]
     reasoning: str = Field(..., description="Explanation for why this action is being taken")
 
+class AddTaskAction(LLMAction):
+    action_type: Literal[ActionType.ADD_TASK] = ActionType.ADD_TASK
+    action_data: TaskUpdate
+
+class UpdateTaskAction(LLMAction):
+    action_type: Literal[ActionType.UPDATE_TASK] = ActionType.UPDATE_TASK
+    action_data: TaskUpdate
+
+class UpdateSummaryAction(LLMAction):
+    action_type: Literal[ActionType.UPDATE_SUMMARY] = ActionType.UPDATE_SUMMARY
+    action_data: SummaryUpdate
+
+class CompleteTaskAction(LLMAction):
+    action_type: Literal[ActionType.COMPLETE_TASK] = ActionType.COMPLETE_TASK
+    action_data: TaskCompletion
+
+class AddSectionAction(LLMAction):
+    action_type: Literal[ActionType.ADD_SECTION] = ActionType.ADD_SECTION
+    action_data: SectionAddition
+
+# Tagged on action_type so pydantic validates action_data against exactly one model
+# instead of trying every member of the untagged Union in turn.
+AnyLLMAction = Annotated[
+    Union[
+        AddTaskAction,
+        UpdateTaskAction,
+        UpdateSummaryAction,
+        CompleteTaskAction,
+        AddSectionAction,
+    ],
+    Field(discriminator="action_type"),
+]
+
+# Built once at import; validating a whole response reuses the compiled schema.
+ACTION_LIST_ADAPTER: TypeAdapter = TypeAdapter(List[AnyLLMAction])
+ACTION_RESPONSE_ADAPTER: TypeAdapter = TypeAdapter(
+    Union[List[AnyLLMAction], AnyLLMAction]
+)
+
+class LineChange(BaseModel):
+    """Lines [start, end) of the preceding content replaced by lines"""
+    start: int
+    end: int
+    lines: List[str] = Field(default_factory=list)
+
+class FileEdit(BaseModel):
+    """Whole-file contents before and after applying one or more actions.
+
+    None means the file does not exist. The digests let readers check which
+    version of a file an edit applies to without comparing whole contents; an
+    edit without changes (e.g. from undo) has to be re-parsed in full.
+    """
+    file_path: str
+    before: Optional[str] = None
+    after: Optional[str]
+    changes: List[LineChange] = Field(default_factory=list)
+    before_digest: Optional[str] = None
+    after_digest: Optional[str] = None
+
+    def inverse(self) -> "FileEdit":
+        """The edit that restores before, with the line changes left unknown"""
+        return FileEdit(
+            file_path=self.file_path,
+            before=self.after,
+            after=self.before,
+            before_digest=self.after_digest,
+            after_digest=self.before_digest,
+        )
+
+def content_digest(content: Optional[str]) -> Optional[str]:
+    if content is None:
+        return None
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+SUMMARY_HEADING = "Summary"
+
+
+def format_task_line(
+    content: str,
+    priority: Optional[Priority] = None,
+    due_date: Optional[datetime] = None,
+    tags: Optional[List[str]] = None,
+    completed: bool = False,
+    completion_date: Optional[datetime] = None,
+) -> str:
+    """Render a task in the Obsidian Tasks format used by SYSTEM_PROMPT"""
+    parts = [f"- [{'x' if completed else ' '}]", content]
+    parts.extend(f"#{tag.lstrip('#')}" for tag in tags or [])
+    if priority:
+        parts.append(Priority(priority).value)
+    if due_date:
+        parts.append(f"📅 {due_date.strftime('%Y-%m-%d')}")
+    if completion_date:
+        parts.append(f"✅ {completion_date.strftime('%Y-%m-%d')}")
+    return " ".join(parts)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _front_matter_end(lines: List[str]) -> int:
+    if lines and lines[0].strip() == "---":
+        for i in range(1, len(lines)):
+            if lines[i].strip() == "---":
+                return i + 1
+    return 0
+
+
+def _find_heading(lines: List[str], heading: str) -> Optional[int]:
+    wanted = _normalize(heading.lstrip("#"))
+    for i, line in enumerate(lines):
+        match = HEADING_PATTERN.match(line)
+        if match and _normalize(match.group(2)) == wanted:
+            return i
+    return None
+
+
+def _section_end(lines: List[str], start: int) -> int:
+    """Index just past the last non-blank line of the section headed at start"""
+    level = len(HEADING_PATTERN.match(lines[start]).group(1))
+    end = len(lines)
+    for i in range(start + 1, len(lines)):
+        match = HEADING_PATTERN.match(lines[i])
+        if match and len(match.group(1)) <= level:
+            end = i
+            break
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    return end
+
+
+def _find_task_line(
+    lines: List[str], content: str, completed: Optional[bool] = None
+) -> int:
+    """Locate a task by exact content, falling back to a unique partial match"""
+    wanted = _normalize(content)
+    exact, partial = [], []
+    for i, line in enumerate(lines):
+        if "- [" not in line:
+            continue
+        task = parse_task_line(line.strip())
+        if task is None or (completed is not None and task.completed != completed):
+            continue
+        if _normalize(task.content) == wanted:
+            exact.append(i)
+        elif wanted in _normalize(task.content):
+            partial.append(i)
+    matches = exact or partial
+    if len(matches) != 1:
+        problem = "No" if not matches else "Ambiguous"
+        raise ValueError(f"{problem} task matching '{content}'")
+    return matches[0]
+
+
+class LineBuffer:
+    """File lines plus the ordered splices made to them"""
+
+    def __init__(self, content: str):
+        self.lines = content.splitlines()
+        self.changes: List[LineChange] = []
+
+    def splice(self, start: int, end: int, new_lines: List[str]) -> None:
+        self.lines[start:end] = new_lines
+        self.changes.append(LineChange(start=start, end=end, lines=new_lines))
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _append_block(
+    buffer: LineBuffer, block: List[str], index: Optional[int] = None
+) -> None:
+    """Insert block at index (default end), separated from text by blank lines"""
+    lines = buffer.lines
+    index = len(lines) if index is None else index
+    if index > 0 and lines[index - 1].strip():
+        block = [""] + block
+    if index < len(lines) and lines[index].strip():
+        block = block + [""]
+    buffer.splice(index, index, block)
+
+
+def fsync_directory(path: Path) -> None:
+    """Make renames, creations and deletions in a directory durable"""
+    if os.name == "nt":
+        # Windows cannot open directories; NTFS journals metadata itself
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 class ActionExecutor:
     def __init__(self, vault_path: str):
-        self.vault_path = vault_path
+        self.vault_path = Path(vault_path).resolve()
 
-    def execute_action(self, action: LLMAction) -> bool:
+    def resolve_path(self, file_path: str) -> Path:
+        path = (self.vault_path / file_path).resolve()
+        if self.vault_path not in path.parents:
+            raise ValueError(f"File path escapes the vault: {file_path}")
+        return path
+
+    def read_file(self, file_path: str) -> Optional[str]:
+        path = self.resolve_path(file_path)
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def write_file(
+        self, file_path: str, content: Optional[str], durable: bool = False
+    ) -> None:
+        """Atomically replace a file; None deletes it.
+
+        durable=True also fsyncs the contents and the directories up to the vault
+        root, so the rename (or deletion) survives a crash.
+        """
+        path = self.resolve_path(file_path)
+        if content is None:
+            path.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        if durable:
+            for directory in self.parent_dirs(path):
+                fsync_directory(directory)
+
+    def parent_dirs(self, path: Path) -> List[Path]:
+        """Existing directories from path's parent up to and including the vault"""
+        dirs = []
+        for parent in path.parents:
+            if parent.exists():
+                dirs.append(parent)
+            if parent == self.vault_path:
+                break
+        return dirs
+
+    def render_action(self, action: LLMAction, buffer: LineBuffer) -> None:
+        """Apply action to buffer, recording the splices it makes"""
         if action.action_type == ActionType.ADD_TASK:
-            return self._add_task(action.action_data)
+            self._add_task(action.action_data, buffer)
+        elif action.action_type == ActionType.UPDATE_TASK:
+            self._update_task(action.action_data, buffer)
         elif action.action_type == ActionType.UPDATE_SUMMARY:
-            return self._update_summary(action.action_data)
+            self._update_summary(action.action_data, buffer)
         elif action.action_type == ActionType.COMPLETE_TASK:
-            return self._complete_task(action.action_data)
+            self._complete_task(action.action_data, buffer)
         elif action.action_type == ActionType.ADD_SECTION:
-            return self._add_section(action.action_data)
+            self._add_section(action.action_data, buffer)
         else:
             raise ValueError(f"Unsupported action type: {action.action_type}")
 
-    def _add_task(self, task_data: TaskUpdate) -> bool:
+    def plan_edits(
+        self,
+        actions: List[LLMAction],
+        contents: Optional[Dict[str, Optional[str]]] = None,
+    ) -> List[FileEdit]:
+        """Render actions in order, coalescing them into one edit per file.
+
+        Each file is split into lines once and joined once per call, however many
+        actions touch it; locating a heading or task still scans its lines.
+        contents overrides what is on disk, e.g. edits committed but not yet written.
+        """
+        contents = contents or {}
+        befores: Dict[str, Optional[str]] = {}
+        buffers: Dict[str, LineBuffer] = {}
+        for action in actions:
+            file_path = action.action_data.file_path
+            if file_path not in buffers:
+                if file_path in contents:
+                    befores[file_path] = contents[file_path]
+                else:
+                    befores[file_path] = self.read_file(file_path)
+                buffers[file_path] = LineBuffer(befores[file_path] or "")
+            self.render_action(action, buffers[file_path])
+
+        edits = []
+        for file_path, buffer in buffers.items():
+            after = buffer.text()
+            edits.append(FileEdit(
+                file_path=file_path,
+                before=befores[file_path],
+                after=after,
+                changes=buffer.changes,
+                before_digest=content_digest(befores[file_path]),
+                after_digest=content_digest(after),
+            ))
+        return edits
+
+    def execute_action(self, action: LLMAction) -> bool:
+        for edit in self.plan_edits([action]):
+            self.write_file(edit.file_path, edit.after, durable=True)
+        return True
+
+    def _add_task(self, task_data: TaskUpdate, buffer: LineBuffer) -> None:
         """Add new task to specified file"""
-        # Implementation would go here
-        pass
+        task_line = format_task_line(
+            task_data.content, task_data.priority, task_data.due_date, task_data.tags
+        )
+        if task_data.section:
+            start = _find_heading(buffer.lines, task_data.section)
+            if start is not None:
+                end = _section_end(buffer.lines, start)
+                buffer.splice(end, end, [task_line])
+                return
+            _append_block(buffer, [f"## {task_data.section}", task_line])
+            return
+        _append_block(buffer, [task_line])
 
-    def _update_summary(self, summary_data: SummaryUpdate) -> bool:
+    def _update_task(self, task_data: TaskUpdate, buffer: LineBuffer) -> None:
+        """Rewrite an existing task's metadata, keeping its indent and state"""
+        index = _find_task_line(buffer.lines, task_data.content)
+        line = buffer.lines[index]
+        existing = parse_task_line(line.strip())
+        indent = line[: len(line) - len(line.lstrip())]
+        buffer.splice(index, index + 1, [indent + format_task_line(
+            existing.content,
+            task_data.priority or existing.priority,
+            task_data.due_date or existing.due_date,
+            task_data.tags or existing.tags,
+            existing.completed,
+            existing.completion_date,
+        )])
+
+    def _update_summary(self, summary_data: SummaryUpdate, buffer: LineBuffer) -> None:
         """Update project summary"""
-        # Implementation would go here
-        pass
+        body = summary_data.content.splitlines()
+        start = _find_heading(buffer.lines, SUMMARY_HEADING)
+        if start is None:
+            block = [f"## {SUMMARY_HEADING}", *body]
+            _append_block(buffer, block, _front_matter_end(buffer.lines))
+            return
+        end = _section_end(buffer.lines, start)
+        if summary_data.replace_existing:
+            buffer.splice(start + 1, end, body)
+        else:
+            _append_block(buffer, body, end)
 
-    def _complete_task(self, completion_data: TaskCompletion) -> bool:
+    def _complete_task(
+        self, completion_data: TaskCompletion, buffer: LineBuffer
+    ) -> None:
         """Mark task as complete"""
-        # Implementation would go here
-        pass
+        index = _find_task_line(
+            buffer.lines, completion_data.task_content, completed=False
+        )
+        line = buffer.lines[index].replace("- [ ]", "- [x]", 1)
+        date = completion_data.completion_date.strftime("%Y-%m-%d")
+        buffer.splice(index, index + 1, [f"{line.rstrip()} ✅ {date}"])
 
-    def _add_section(self, section_data: SectionAddition) -> bool:
+    def _add_section(self, section_data: SectionAddition, buffer: LineBuffer) -> None:
         """Add new section to file"""
-        # Implementation would go here
-        pass
+        block = [f"## {section_data.heading}", *section_data.content.splitlines()]
+        position = section_data.position
+        if position == "top":
+            _append_block(buffer, block, _front_matter_end(buffer.lines))
+        elif position.startswith("after:"):
+            start = _find_heading(buffer.lines, position[len("after:"):])
+            if start is None:
+                raise ValueError(f"Heading not found: {position[len('after:'):]}")
+            _append_block(buffer, block, _section_end(buffer.lines, start))
+        else:
+            _append_block(buffer, block)
@@ -1,54 +1,141 @@
+import time
+from typing import Dict, List, Optional
+
 import instructor
 import obsidiantools.api as otools
 from openai import OpenAI
-from pydantic import BaseModel
 
 # Import our previously defined models and prompt
+from obsidian_debrief import config
 from obsidian_debrief.actions import ActionExecutor, LLMAction
-from obsidian_debrief.prompts.system import SYSTEM_PROMPT
+from obsidian_debrief.prompts.system import COMPACT_SYSTEM_PROMPT, SYSTEM_PROMPT
+from obsidian_debrief.utils.files import Task
+from obsidian_debrief.utils.intents import IntentRecognizer
+from obsidian_debrief.utils.llm import validate_llm_response
+from obsidian_debrief.utils.project import parse_file_tasks
+from obsidian_debrief.utils.routing import EndpointConfig, EndpointPool
+
+# One generation plus one re-generation when local repair cannot fix the output
+MAX_GENERATION_ATTEMPTS = 2
+
+_endpoint_pool: Optional[EndpointPool] = None
+intent_recognizer = IntentRecognizer()
+
+
+def _instructor_client(endpoint: EndpointConfig) -> instructor.Instructor:
+    return instructor.patch(
+        OpenAI(
+            base_url=endpoint.base_url,
+            api_key=endpoint.api_key,
+        ),
+        mode=instructor.Mode.JSON,
+    )
 
 
-class ActionList(BaseModel):
-    list_: LLMAction
+def get_endpoint_pool() -> EndpointPool:
+    """Shared pool so routing and hedging see latency history across requests"""
+    global _endpoint_pool
+    if _endpoint_pool is None:
+        _endpoint_pool = EndpointPool.from_config(client_factory=_instructor_client)
+        # Start with dead boxes marked down instead of finding out per request
+        _endpoint_pool.check_health()
+    return _endpoint_pool
 
 
-def test_vault_action(vault_path: str, user_request: str) -> list[LLMAction]:
+def build_vault_context(vault_path: str) -> str:
     # Initialize vault connection
     vault = otools.Vault(vault_path).connect().gather()
 
     # Create context about current vault state
-    vault_context = f"""
+    return f"""
     Current vault state:
     - Total files: {len(vault.md_file_index)}
     - Project files: {sum(1 for f in vault.md_file_index if '#project' in ' '.join(vault.get_tags(f)))}
     - Available project files: {[f for f in vault.md_file_index.keys() if '#project' in ' '.join(vault.get_tags(f))]}
     """
 
-    # Setup instructor client
-    client = instructor.patch(
-        OpenAI(
-            base_url="http://localhost:11434/v1",
-            api_key="ollama",
-        ),
-        mode=instructor.Mode.JSON,
-    )
 
-    # Get LLM response
-    response = client.chat.completions.create(
-        model="llama3.1:8b",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": f"Vault Context:\n{vault_context}\n\nUser Request: {user_request}",
-            },
-        ],
-        response_model=ActionList,
+def _request_messages(
+    system_prompt: str, vault_path: str, user_request: str
+) -> List[Dict[str, str]]:
+    vault_context = build_vault_context(vault_path)
+    return [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": (
+                f"Vault Context:\n{vault_context}\n\nUser Request: {user_request}"
+            ),
+        },
+    ]
+
+
+def _complete(messages: List[Dict[str, str]]) -> str:
+    response = get_endpoint_pool().create(
+        messages=messages,
+        response_model=None,
         max_tokens=2000,
         temperature=0.7,
     )
+    return response.choices[0].message.content
+
+
+def _generate_actions(
+    messages: List[Dict[str, str]], compact: bool = False
+) -> List[LLMAction]:
+    """Generate and validate actions, re-generating if repair cannot save the output.
 
-    return response
+    The raw completion is validated locally through the discriminated union in
+    validate_llm_response; if the last attempt is still invalid its error is raised.
+    """
+    for _ in range(MAX_GENERATION_ATTEMPTS - 1):
+        content = _complete(messages)
+        try:
+            return validate_llm_response(content, compact=compact)
+        except ValueError as error:
+            # ValidationError or JSONDecodeError; show the model what went wrong
+            messages = [
+                *messages,
+                {"role": "assistant", "content": content},
+                {
+                    "role": "user",
+                    "content": f"That output was invalid ({error}). "
+                    "Reply with only the corrected JSON.",
+                },
+            ]
+    return validate_llm_response(_complete(messages), compact=compact)
+
+
+def test_vault_action(vault_path: str, user_request: str) -> List[LLMAction]:
+    # Get LLM response from the least loaded configured endpoint
+    return _generate_actions(_request_messages(SYSTEM_PROMPT, vault_path, user_request))
+
+
+def compact_vault_action(vault_path: str, user_request: str) -> List[LLMAction]:
+    """Request the compact wire format and expand it back into LLMActions"""
+    messages = _request_messages(COMPACT_SYSTEM_PROMPT, vault_path, user_request)
+    return _generate_actions(messages, compact=True)
+
+
+def get_actions(vault_path: str, user_request: str) -> List[LLMAction]:
+    """Resolve formulaic requests locally; only ambiguous ones reach the LLM"""
+    executor = ActionExecutor(vault_path)
+
+    def file_tasks(file_path: str) -> List[Task]:
+        # A missing file has no tasks yet; add_task will create it
+        return parse_file_tasks(executor.read_file(file_path) or "")
+
+    actions = intent_recognizer.recognize(user_request, file_tasks)
+    if actions is not None:
+        return actions
+
+    start = time.perf_counter()
+    if config.LLM_COMPACT_OUTPUT:
+        actions = compact_vault_action(vault_path, user_request)
+    else:
+        actions = test_vault_action(vault_path, user_request)
+    intent_recognizer.stats.record_llm(time.perf_counter() - start)
+    return actions
 
 if __name__ == "__main__":
     VAULT_PATH = "/home/walkenz1/Sync/HomeVault"
@@ -69,8 +156,8 @@ if __name__ == "__main__":
         print(f"\nTesting request: {request}")
         print("-" * 80)
 
-        # Get actions from LLM
-        actions = test_vault_action(VAULT_PATH, request)
+        # Get actions from the fast path or the LLM
+        actions = get_actions(VAULT_PATH, request)
 
         print("\nGenerated Actions:")
         for action in actions:
@@ -88,11 +175,13 @@ if __name__ == "__main__":
 
             print("-" * 40)
 
+    print(f"\nFast path stats: {intent_recognizer.stats.report()}")
+
 
 # Example usage with specific request
 def process_user_request(vault_path: str, request: str) -> None:
     """Process a single user request"""
-    actions = test_vault_action(vault_path, request)
+    actions = get_actions(vault_path, request)
     executor = ActionExecutor(vault_path)
 
     print(f"\nProcessing request: {request}")
@@ -1 +1,26 @@
+import os
+
 TASK_TAG = "#TODO"
+
+# Vault the API applies confirmed actions to (mounted at /vault in docker-compose)
+VAULT_PATH = os.getenv("DEBRIEF_VAULT_PATH", "/vault")
+
+# Comma-separated OpenAI-compatible base URLs, routed by utils.routing.EndpointPool
+LLM_ENDPOINTS = [
+    url.strip()
+    for url in os.getenv("DEBRIEF_LLM_ENDPOINTS", "http://localhost:11434/v1").split(",")
+    if url.strip()
+]
+LLM_MODEL = os.getenv("DEBRIEF_LLM_MODEL", "llama3.1:8b")
+LLM_API_KEY = os.getenv("DEBRIEF_LLM_API_KEY", "ollama")
+LLM_MAX_CONCURRENCY = int(os.getenv("DEBRIEF_LLM_MAX_CONCURRENCY", "2"))
+# Latency percentile (0-100) after which a duplicate request is sent; unset disables
+LLM_HEDGE_PERCENTILE = (
+    float(os.environ["DEBRIEF_LLM_HEDGE_PERCENTILE"])
+    if os.getenv("DEBRIEF_LLM_HEDGE_PERCENTILE")
+    else None
+)
+# Ask the model for the short-key format in utils.compact instead of verbose JSON
+LLM_COMPACT_OUTPUT = (
+    os.getenv("DEBRIEF_LLM_COMPACT_OUTPUT", "").lower() in ("1", "true", "yes")
+)
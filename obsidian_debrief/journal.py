@@ -0,0 +1,459 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from obsidian_debrief.actions import (
+    ActionExecutor,
+    FileEdit,
+    LLMAction,
+    fsync_directory,
+)
+
+
+class JournalBatch(BaseModel):
+    """A group of actions committed to the journal as one durable record"""
+    batch_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    edits: List[FileEdit]
+    actions: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class JournalWriteError(RuntimeError):
+    """Appending to the journal failed; the records in that flush are not committed"""
+
+
+class BatchApplyError(RuntimeError):
+    """Committing or writing a batch failed; it and batches built on it are dropped"""
+
+    def __init__(self, batch_ids: List[str], error: BaseException):
+        super().__init__(
+            f"Batch {batch_ids[0] if batch_ids else '?'} failed ({error}); "
+            f"dropped batches: {', '.join(batch_ids)}"
+        )
+        self.batch_ids = batch_ids
+
+
+class RecoveryResult(BaseModel):
+    rewritten: List[str] = Field(default_factory=list)
+    conflicts: List[str] = Field(default_factory=list)
+    undone: List[str] = Field(default_factory=list)
+
+
+class ActionJournal:
+    """Write-ahead journal for executed actions.
+
+    commit() plans a batch of actions into whole-file edits and appends them as a
+    single record. Records from concurrent callers are flushed together under one
+    fsync (group commit), so a batch is durable once commit() returns. apply()
+    then writes the vault files in commit order without fsyncing each one.
+    checkpoint() fsyncs them and their directories and truncates the journal; it
+    runs automatically once the journal passes checkpoint_bytes and every batch
+    is applied, which also ends undo history for the batches it covers.
+
+    If journaling a batch fails, the partial records are truncated away and every
+    commit() in that flush raises. If writing a batch fails, its written files
+    are restored. Either way the batch and any later unapplied batches touching
+    the same files are recorded as failed and dropped, and the commit() or
+    apply() that hits it raises BatchApplyError.
+
+    After a crash, recover() walks each file's chain of committed contents and
+    rolls it forward to the last batch, or back to before the first batch not
+    marked applied with undo=True. Files whose contents match no state in the
+    chain were edited outside debrief and are reported rather than overwritten.
+    """
+
+    def __init__(
+        self,
+        executor: ActionExecutor,
+        journal_path: Optional[Path] = None,
+        on_apply: Optional[Callable[["JournalBatch"], None]] = None,
+        checkpoint_bytes: Optional[int] = 16 * 1024 * 1024,
+    ):
+        self.executor = executor
+        # Called with a JournalBatch after its files are written, including the
+        # inverse edits undo() and recover() write; e.g. to keep a ProjectLoader
+        # in step: on_apply=lambda batch: loader.apply_edits(batch.edits)
+        self.on_apply = on_apply
+        self.checkpoint_bytes = checkpoint_bytes
+        self.journal_path = (
+            journal_path or executor.vault_path / ".debrief" / "journal.jsonl"
+        )
+        self._open_journal()
+
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._queued = 0
+        self._written = 0
+        self._synced = 0
+        self._flushing = False
+        # (after, through, error): flushes of tickets in (after, through] that failed
+        self._failed: List[Tuple[int, int, BaseException]] = []
+
+        self._plan_lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        # Committed but not yet written; later commits must plan against these
+        self._unapplied: "OrderedDict[str, JournalBatch]" = OrderedDict()
+        # Tickets of batches whose commit() has not returned yet
+        self._in_flight: Dict[str, int] = {}
+        # Errors for in-flight commits whose batch was dropped under them
+        self._dropped: Dict[str, BatchApplyError] = {}
+
+    def _open_journal(self) -> None:
+        """Create the journal, or trim a torn record left by a crash"""
+        if self.journal_path.exists():
+            self._trim_torn_tail()
+            return
+        created = [
+            d for d in (self.journal_path.parent, *self.journal_path.parent.parents)
+            if not d.exists()
+        ]
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_path.touch()
+        fsync_directory(self.journal_path.parent)
+        for directory in created:
+            fsync_directory(directory.parent)
+
+    def _trim_torn_tail(self) -> None:
+        # New records would otherwise be appended to the torn line, and _records()
+        # stops at the first line that does not parse
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            end = 0
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                end += len(line)
+            if end < len(data):
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _enqueue(self, record: Dict[str, Any]) -> int:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._cond:
+            self._pending.append(line)
+            self._queued += 1
+            return self._queued
+
+    def _flush(self, ticket: int, durable: bool = True) -> None:
+        """Block until the record with this ticket is written, and fsynced if durable.
+
+        Raises JournalWriteError if the flush that carried the record failed.
+        """
+        with self._cond:
+            while (self._synced if durable else self._written) < ticket:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                # Become the leader and flush everything queued so far at once
+                lines, self._pending = self._pending, []
+                after = self._synced if durable else self._written
+                target = self._queued
+                self._flushing = True
+                self._cond.release()
+                failure = None
+                try:
+                    self._append("".join(lines).encode("utf-8"), durable)
+                except OSError as error:
+                    failure = error
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    self._cond.notify_all()
+                if failure is not None:
+                    self._failed.append((after, target, failure))
+                self._written = target
+                if durable:
+                    self._synced = target
+            for after, through, error in self._failed:
+                if after < ticket <= through:
+                    raise JournalWriteError(
+                        f"Failed to write {self.journal_path}: {error}"
+                    ) from error
+
+    def _append(self, data: bytes, durable: bool) -> None:
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            start = os.lseek(fd, 0, os.SEEK_END)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if durable:
+                    os.fsync(fd)
+            except OSError:
+                # Take back whatever part of the group reached the file
+                try:
+                    os.ftruncate(fd, start)
+                except OSError:
+                    pass
+                raise
+        finally:
+            os.close(fd)
+
+    def _records(self) -> List[Dict[str, Any]]:
+        try:
+            self._flush(self._queued, durable=False)
+        except JournalWriteError:
+            # Those records were never committed; read what did reach the file
+            pass
+        if not self.journal_path.exists():
+            return []
+        records = []
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn write from a crash mid-append; it was never committed
+                    break
+        return records
+
+    def _batches(self) -> Tuple["OrderedDict[str, JournalBatch]", Set[str]]:
+        """Committed, not undone batches in commit order, and the ids marked applied"""
+        batches: "OrderedDict[str, JournalBatch]" = OrderedDict()
+        applied = set()
+        for record in self._records():
+            kind = record.pop("type")
+            if kind == "commit":
+                batches[record["batch_id"]] = JournalBatch(**record)
+            elif kind == "applied":
+                applied.add(record["batch_id"])
+            elif kind in ("undone", "failed"):
+                batches.pop(record["batch_id"], None)
+        return batches, applied
+
+    def commit(self, actions: List[LLMAction]) -> JournalBatch:
+        """Durably record a batch of actions; returns before any file is written"""
+        with self._plan_lock:
+            overlay: Dict[str, Optional[str]] = {}
+            for pending in self._unapplied.values():
+                overlay.update({edit.file_path: edit.after for edit in pending.edits})
+            batch = JournalBatch(
+                edits=self.executor.plan_edits(actions, overlay),
+                actions=[action.model_dump(mode="json") for action in actions],
+            )
+            self._unapplied[batch.batch_id] = batch
+            ticket = self._enqueue({"type": "commit", **batch.model_dump(mode="json")})
+            self._in_flight[batch.batch_id] = ticket
+        try:
+            self._flush(ticket)
+        except JournalWriteError as error:
+            self._drop_failed(batch, error)
+        with self._plan_lock:
+            del self._in_flight[batch.batch_id]
+            dropped = self._dropped.pop(batch.batch_id, None)
+        if dropped is not None:
+            raise dropped
+        return batch
+
+    def apply(self, batch: JournalBatch) -> None:
+        """Write a committed batch, and any batches committed before it, to the vault"""
+        with self._apply_lock:
+            while batch.batch_id in self._unapplied:
+                with self._plan_lock:
+                    batch_id, earliest = next(iter(self._unapplied.items()))
+                    ticket = self._in_flight.get(batch_id)
+                if ticket is not None:
+                    # Its commit() has not returned; never write an unjournaled batch
+                    try:
+                        self._flush(ticket)
+                    except JournalWriteError as error:
+                        raise self._drop_failed(earliest, error) from error
+                self._write_batch(earliest)
+                with self._plan_lock:
+                    del self._unapplied[batch_id]
+                # Written but not fsynced; the marker only guides undo in recover()
+                ticket = self._enqueue({"type": "applied", "batch_id": batch_id})
+                try:
+                    self._flush(ticket, durable=False)
+                except JournalWriteError:
+                    pass
+                if self.on_apply is not None:
+                    self.on_apply(earliest)
+        self._maybe_checkpoint()
+
+    def _write_batch(self, batch: JournalBatch) -> None:
+        written: List[FileEdit] = []
+        try:
+            for edit in batch.edits:
+                self.executor.write_file(edit.file_path, edit.after)
+                written.append(edit)
+        except Exception as error:
+            for edit in reversed(written):
+                try:
+                    self.executor.write_file(edit.file_path, edit.before)
+                except OSError:
+                    # recover() will report the file as a conflict
+                    pass
+            raise self._drop_failed(batch, error) from error
+
+    def _drop_failed(
+        self, failed: JournalBatch, error: BaseException
+    ) -> BatchApplyError:
+        """Drop a batch and the unapplied batches planned on top of its files"""
+        with self._plan_lock:
+            if failed.batch_id not in self._unapplied:
+                # Already dropped by a concurrent commit() or apply()
+                return BatchApplyError([failed.batch_id], error)
+            files = {edit.file_path for edit in failed.edits}
+            dropped = []
+            for batch_id, batch in list(self._unapplied.items()):
+                touched = {edit.file_path for edit in batch.edits}
+                if batch_id == failed.batch_id or touched & files:
+                    files |= touched
+                    dropped.append(batch_id)
+                    del self._unapplied[batch_id]
+            apply_error = BatchApplyError(dropped, error)
+            for batch_id in dropped:
+                ticket = self._enqueue({"type": "failed", "batch_id": batch_id})
+                if batch_id in self._in_flight:
+                    self._dropped[batch_id] = apply_error
+        try:
+            self._flush(ticket)
+        except JournalWriteError:
+            # Without the records recover() may still roll these batches forward
+            pass
+        return apply_error
+
+    def _maybe_checkpoint(self) -> None:
+        if self.checkpoint_bytes is None or self._unapplied:
+            return
+        try:
+            if self.journal_path.stat().st_size < self.checkpoint_bytes:
+                return
+            self.checkpoint()
+        except (OSError, RuntimeError):
+            # Batches are still in flight, or recover() left conflicts to resolve
+            pass
+
+    def _notify(self, edits: List[FileEdit], batch_id: Optional[str] = None) -> None:
+        """Pass edits written outside apply() to on_apply"""
+        if self.on_apply is None or not edits:
+            return
+        batch = JournalBatch(edits=edits)
+        if batch_id is not None:
+            batch.batch_id = batch_id
+        self.on_apply(batch)
+
+    def execute(self, actions: List[LLMAction]) -> JournalBatch:
+        batch = self.commit(actions)
+        self.apply(batch)
+        return batch
+
+    def undo(self, batch_id: str) -> None:
+        """Restore the files touched by an applied batch to their contents before it"""
+        with self._apply_lock:
+            batches, _ = self._batches()
+            if batch_id not in batches or batch_id in self._unapplied:
+                raise ValueError(
+                    f"Unknown, unapplied or already undone batch: {batch_id}"
+                )
+            ids = list(batches)
+            batch = batches[batch_id]
+            touched = {edit.file_path for edit in batch.edits}
+            for later_id in ids[ids.index(batch_id) + 1:]:
+                if touched & {edit.file_path for edit in batches[later_id].edits}:
+                    raise ValueError(
+                        f"Batch {later_id} edited the same files; undo it first"
+                    )
+            for edit in batch.edits:
+                if self.executor.read_file(edit.file_path) != edit.after:
+                    raise ValueError(f"{edit.file_path} changed since batch {batch_id}")
+            for edit in batch.edits:
+                self.executor.write_file(edit.file_path, edit.before)
+            self._flush(self._enqueue({"type": "undone", "batch_id": batch_id}))
+            self._notify([edit.inverse() for edit in batch.edits], batch_id)
+
+    @staticmethod
+    def _chains(
+        batches: "OrderedDict[str, JournalBatch]", cutoff: int
+    ) -> Tuple[Dict[str, List[Optional[str]]], Dict[str, int]]:
+        """Per file: every committed state in order, and the index of the target"""
+        chains: Dict[str, List[Optional[str]]] = {}
+        targets: Dict[str, int] = {}
+        for index, batch in enumerate(batches.values()):
+            for edit in batch.edits:
+                chain = chains.setdefault(edit.file_path, [edit.before])
+                if index >= cutoff and edit.file_path not in targets:
+                    targets[edit.file_path] = len(chain) - 1
+                chain.append(edit.after)
+        return chains, targets
+
+    def recover(self, undo: bool = False) -> RecoveryResult:
+        """Bring the vault in line with the journal after a crash.
+
+        Call once at startup, before any new commits.
+        """
+        with self._apply_lock, self._plan_lock:
+            batches, applied = self._batches()
+            ids = list(batches)
+            cutoff = len(ids)
+            if undo:
+                unapplied = (i for i, b in enumerate(ids) if b not in applied)
+                cutoff = next(unapplied, len(ids))
+            chains, targets = self._chains(batches, cutoff)
+
+            result = RecoveryResult(undone=ids[cutoff:])
+            rewrites = []
+            for file_path, chain in chains.items():
+                target = chain[targets.get(file_path, len(chain) - 1)]
+                current = self.executor.read_file(file_path)
+                if current == target:
+                    continue
+                if current in chain:
+                    self.executor.write_file(file_path, target)
+                    result.rewritten.append(file_path)
+                    rewrites.append(
+                        FileEdit(file_path=file_path, before=current, after=target)
+                    )
+                else:
+                    result.conflicts.append(file_path)
+
+            conflicted = set(result.conflicts)
+            for batch_id in ids[:cutoff]:
+                edited = {edit.file_path for edit in batches[batch_id].edits}
+                if batch_id not in applied and not edited & conflicted:
+                    self._enqueue({"type": "applied", "batch_id": batch_id})
+            for batch_id in result.undone:
+                self._enqueue({"type": "undone", "batch_id": batch_id})
+            self._flush(self._queued)
+        self._notify(rewrites)
+        return result
+
+    def checkpoint(self, force: bool = False) -> None:
+        """Make the vault files durable and truncate the journal once all is applied.
+
+        Each touched file and the directories above it are fsynced first, so the
+        renames apply() made survive without the journal. Undo history is
+        discarded along with the journal. force=True also drops batches that
+        recover() left unapplied because of conflicts.
+        """
+        with self._apply_lock, self._plan_lock:
+            batches, applied = self._batches()
+            if self._unapplied or (set(batches) - applied and not force):
+                raise RuntimeError(
+                    "Cannot checkpoint with unapplied batches; run recover()"
+                )
+            directories = set()
+            for file_path in {e.file_path for b in batches.values() for e in b.edits}:
+                path = self.executor.resolve_path(file_path)
+                if path.exists():
+                    with open(path, "rb") as f:
+                        os.fsync(f.fileno())
+                directories.update(self.executor.parent_dirs(path))
+            for directory in directories:
+                fsync_directory(directory)
+            with self._cond:
+                while self._flushing:
+                    self._cond.wait()
+                self.journal_path.write_text("", encoding="utf-8")
@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from obsidian_debrief.actions import ActionType, LLMAction, Priority
+
+# Two-letter codes for ActionType on the wire
+ACTION_CODES = {
+    ActionType.UPDATE_SUMMARY: "us",
+    ActionType.ADD_TASK: "at",
+    ActionType.COMPLETE_TASK: "ct",
+    ActionType.UPDATE_TASK: "ut",
+    ActionType.ADD_SECTION: "as",
+}
+ACTION_TYPES = {code: action_type for action_type, code in ACTION_CODES.items()}
+
+# 1 = highest ... 4 = lowest, matching the order of the emoji in SYSTEM_PROMPT
+PRIORITY_CODES = {
+    Priority.HIGHEST: 1,
+    Priority.HIGH: 2,
+    Priority.MEDIUM: 3,
+    Priority.LOW: 4,
+}
+PRIORITIES = {code: priority for priority, code in PRIORITY_CODES.items()}
+
+# Short key -> action_data field name, per action data model
+TASK_KEYS = {
+    "c": "content",
+    "p": "priority",
+    "d": "due_date",
+    "g": "tags",
+    "f": "file_path",
+    "s": "section",
+}
+FIELD_KEYS = {
+    ActionType.ADD_TASK: TASK_KEYS,
+    ActionType.UPDATE_TASK: TASK_KEYS,
+    ActionType.UPDATE_SUMMARY: {
+        "c": "content",
+        "f": "file_path",
+        "x": "replace_existing",
+    },
+    ActionType.COMPLETE_TASK: {
+        "c": "task_content",
+        "f": "file_path",
+        "d": "completion_date",
+    },
+    ActionType.ADD_SECTION: {
+        "h": "heading",
+        "c": "content",
+        "f": "file_path",
+        "o": "position",
+    },
+}
+
+
+def expand_action(
+    compact: Dict[str, Any], max_reasoning: Optional[int] = None
+) -> Dict[str, Any]:
+    """Expand one compact action into the verbose LLMAction dict.
+
+    Unknown action codes and keys, and values of the wrong type, are passed
+    through unchanged so the validator reports them instead of this function
+    silently dropping data or raising something other than a ValidationError.
+    """
+    code = compact.get("t")
+    action_type = ACTION_TYPES.get(code, code) if isinstance(code, str) else code
+    keys = FIELD_KEYS.get(action_type, {}) if isinstance(action_type, str) else {}
+
+    action_data = compact.get("d") or {}
+    if isinstance(action_data, dict):
+        expanded = {}
+        for key, value in action_data.items():
+            field = keys.get(key, key)
+            expanded[field] = _expand_value(field, value)
+        action_data = expanded
+
+    reasoning = compact.get("r") or ""
+    if max_reasoning is not None and isinstance(reasoning, str):
+        reasoning = reasoning[:max_reasoning]
+    return {
+        "action_type": action_type,
+        "action_data": action_data,
+        "reasoning": reasoning,
+    }
+
+
+def _expand_value(field: str, value: Any) -> Any:
+    if field == "priority":
+        # Small models often quote numbers: "p":"2"
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        # bool is an int, and True would otherwise look up code 1
+        if isinstance(value, int) and not isinstance(value, bool):
+            return PRIORITIES.get(value, value)
+    elif field == "replace_existing" and isinstance(value, int):
+        return bool(value)
+    return value
+
+
+def compress_action(
+    action: LLMAction, include_reasoning: bool = True
+) -> Dict[str, Any]:
+    """Inverse of expand_action; defaults are omitted to keep the output short"""
+    keys = {field: key for key, field in FIELD_KEYS[action.action_type].items()}
+    data = {}
+    action_data = action.action_data.model_dump(exclude_defaults=True)
+    for field, value in action_data.items():
+        if field == "priority":
+            value = PRIORITY_CODES[value]
+        elif isinstance(value, datetime):
+            is_date = value.time() == datetime.min.time()
+            value = value.strftime("%Y-%m-%d") if is_date else value.isoformat()
+        elif isinstance(value, bool):
+            value = int(value)
+        data[keys[field]] = value
+
+    compact: Dict[str, Any] = {"t": ACTION_CODES[action.action_type], "d": data}
+    if include_reasoning and action.reasoning:
+        compact["r"] = action.reasoning
+    return compact
+
+
+def expand_actions(compact: Any, max_reasoning: Optional[int] = None) -> Any:
+    if isinstance(compact, dict):
+        compact = [compact]
+    if not isinstance(compact, list):
+        # Not an action or a list of them; let the validator say so
+        return compact
+    return [
+        expand_action(item, max_reasoning) if isinstance(item, dict) else item
+        for item in compact
+    ]
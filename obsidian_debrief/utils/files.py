@@ -1,11 +1,26 @@
+from collections import Counter
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from obsidian_debrief.utils.project import Task, TaskPriority
 
+class TaskPriority(str, Enum):
+    HIGHEST = "⏫"
+    HIGH = "🔼"
+    MEDIUM = "🔽"
+    LOW = "⏬"
+
+class Task(BaseModel):
+    content: str
+    completed: bool = False
+    priority: Optional[TaskPriority] = None
+    due_date: Optional[datetime] = None
+    completion_date: Optional[datetime] = None
+    tags: List[str] = Field(default_factory=list)
+    line: Optional[int] = Field(None, description="0-based line number within its file")
 
 class ObsidianFile(BaseModel):
     name: str
@@ -17,6 +32,13 @@ class ObsidianFile(BaseModel):
     backlinks: List[str] = Field(default_factory=list)
     wikilinks: List[str] = Field(default_factory=list)
 
+    # Line-level state for incremental re-parsing, built on first patch
+    _lines: Optional[List[str]] = PrivateAttr(default=None)
+    _tag_counts: Counter = PrivateAttr(default_factory=Counter)
+    _base_tags: List[str] = PrivateAttr(default_factory=list)
+    # content_digest(content), so edits can be matched without comparing contents
+    _digest: Optional[str] = PrivateAttr(default=None)
+
 class Project(BaseModel):
     main_file: ObsidianFile
     working_files: List[ObsidianFile] = Field(default_factory=list)
@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from obsidian_debrief.utils.files import Task, TaskPriority
+
+BucketKey = Tuple[str, Optional[TaskPriority]]
+# (due_date, insertion sequence, project, task); the sequence keeps ties off the task
+Entry = Tuple[datetime, int, str, Task]
+
+
+def local_naive(moment: datetime) -> datetime:
+    """Convert an aware datetime to naive local time, as task due dates are stored"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+class TaskIndex:
+    """Pending tasks with a due date, ordered by due date per (project, priority).
+
+    Each bucket is a sorted list, so a range query costs a bisect per matching
+    bucket plus the k results, merged in due-date order. Tasks without a due date
+    or already completed are not indexed. A working file shared by several projects
+    indexes its tasks once per project; queries return each task once.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[BucketKey, List[Entry]] = {}
+        self._entries: Dict[int, List[Entry]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, project: str, task: Task) -> None:
+        if task.completed or task.due_date is None:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(id(task), [])
+            if any(entry[2] == project for entry in entries):
+                return
+            entry = (task.due_date, next(self._sequence), project, task)
+            insort(self._buckets.setdefault((project, task.priority), []), entry)
+            entries.append(entry)
+
+    def remove(self, task: Task) -> None:
+        with self._lock:
+            for entry in self._entries.pop(id(task), []):
+                bucket = self._buckets[(entry[2], entry[3].priority)]
+                del bucket[bisect_left(bucket, entry[:2])]
+
+    def update(
+        self, projects: Iterable[str], removed: List[Task], added: List[Task]
+    ) -> None:
+        """Apply a task delta for a file's projects, e.g. from apply_file_edit"""
+        with self._lock:
+            for task in removed:
+                self.remove(task)
+            for project in projects:
+                for task in added:
+                    self.add(project, task)
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        priorities: Optional[Iterable[Optional[TaskPriority]]] = None,
+        projects: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, Task]]:
+        """(project, task) pairs with start <= due_date < end, earliest first.
+
+        Aware bounds are converted to local time to compare with due dates.
+        """
+        start = local_naive(start) if start else None
+        end = local_naive(end) if end else None
+        priorities = set(priorities) if priorities is not None else None
+        projects = set(projects) if projects is not None else None
+        with self._lock:
+            ranges = []
+            for (project, priority), bucket in self._buckets.items():
+                if projects is not None and project not in projects:
+                    continue
+                if priorities is not None and priority not in priorities:
+                    continue
+                lo = bisect_left(bucket, (start,)) if start else 0
+                hi = bisect_left(bucket, (end,)) if end else len(bucket)
+                if lo < hi:
+                    ranges.append(bucket[lo:hi])
+
+        results = []
+        seen = set()
+        for _, _, project, task in heapq.merge(*ranges):
+            if id(task) in seen:
+                continue
+            seen.add(id(task))
+            results.append((project, task))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
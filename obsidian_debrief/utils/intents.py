@@ -0,0 +1,361 @@
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from obsidian_debrief.actions import (
+    AddSectionAction,
+    AddTaskAction,
+    CompleteTaskAction,
+    LLMAction,
+    Priority,
+    SectionAddition,
+    TaskCompletion,
+    TaskUpdate,
+)
+from obsidian_debrief.utils.files import Task
+
+WEEKDAYS = [
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"
+]
+
+PRIORITY_WORDS = {
+    "highest": Priority.HIGHEST,
+    "urgent": Priority.HIGHEST,
+    "critical": Priority.HIGHEST,
+    "high": Priority.HIGH,
+    "medium": Priority.MEDIUM,
+    "normal": Priority.MEDIUM,
+    "low": Priority.LOW,
+}
+
+
+def _quoted(name: str) -> str:
+    return rf"['\"“‘](?P<{name}>[^'\"”’]+)['\"”’]"
+
+
+PRIORITY = r"(?P<priority>" + "|".join(PRIORITY_WORDS) + r")"
+DATE = (
+    r"(?P<date>today|tomorrow|next week|in \d+ (?:day|week)s?|\d{4}-\d{2}-\d{2}"
+    r"|(?:next |this )?(?:" + "|".join(WEEKDAYS) + r"))"
+)
+# No spaces, so "in A.md in B.md" can't read as one path; spaced paths go to the LLM
+FILE = r"(?:the\s+)?(?P<file>[\w\-./]+\.md)(?:\s+file)?"
+PLACE = r"(?:(?:add|put|place|move)\s+(?:it\s+)?)?"
+
+COMPLETE_PATTERNS = [
+    re.compile(
+        r"(?:mark|set)\s+(?:the\s+)?(?:task\s+)?"
+        r"(?:" + _quoted("task") + r"|(?P<bare>.+?))"
+        r"\s+as\s+(?:complete|completed|done|finished)\s+in\s+" + FILE,
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"(?:complete|finish|tick off|check off)\s+(?:the\s+)?(?:task\s+)?"
+        r"(?:" + _quoted("task") + r"|(?P<bare>.+?))\s+in\s+" + FILE,
+        re.IGNORECASE,
+    ),
+]
+
+ADD_TASK_HEAD = re.compile(
+    r"add\s+(?:a|an)\s+(?:new\s+)?(?:" + PRIORITY + r"[\s-]+priority\s+)?task\s+"
+    r"(?:to\s+|for\s+(?:the\s+)?|called\s+|:\s*)?"
+    r"(?P<content>.+?)"
+    r"(?:\s+with\s+(?:these|the following)\s+details)?:?",
+    re.IGNORECASE,
+)
+
+ADD_SECTION_PATTERN = re.compile(
+    r"add\s+(?:a\s+)?(?:new\s+)?section\s+(?:called|named|titled)\s+"
+    r"(?:" + _quoted("heading") + r"|(?P<bare>[\w\- ]+?))\s+(?:to|in)\s+" + FILE
+    + r"(?:\s+(?:at\s+the\s+(?P<edge>top|bottom)|after\s+(?:the\s+)?"
+    + _quoted("after") + r"(?:\s+section)?))?",
+    re.IGNORECASE,
+)
+
+# Modifier clauses that may follow the head of an add-task request
+CLAUSE_PATTERNS = {
+    "due": re.compile(r"(?:it(?:'s| is)\s+)?(?:due|by)\s+" + DATE, re.IGNORECASE),
+    "file": re.compile(PLACE + r"(?:to|in|into)\s+" + FILE, re.IGNORECASE),
+    "section": re.compile(
+        PLACE + r"under\s+(?:the\s+)?(?:" + _quoted("section")
+        + r"|(?P<bare>[\w\- ]+?))(?:\s+(?:section|heading))?",
+        re.IGNORECASE,
+    ),
+    "tags": re.compile(
+        r"tag(?:ged)?\s+(?:it\s+)?(?:with|as)\s+"
+        r"(?P<tags>#\w+(?:(?:\s*,\s*|\s+and\s+|\s+)#\w+)*)",
+        re.IGNORECASE,
+    ),
+    "priority": re.compile(
+        r"(?:make\s+it\s+|with\s+(?:a\s+)?)?" + PRIORITY + r"\s+priority", re.IGNORECASE
+    ),
+}
+
+# Same modifiers written inline at the end of the head clause
+INLINE_PATTERNS = {
+    "due": re.compile(r"\s+(?:due|by)\s+" + DATE + r"$", re.IGNORECASE),
+    "file": re.compile(r"\s+(?:to|in|into)\s+" + FILE + r"$", re.IGNORECASE),
+}
+
+# Split on commas, semicolons and newlines, but not inside a "#a, #b" tag list
+CLAUSE_SPLIT = re.compile(r"[,;\n]+(?!\s*(?:and\s+)?#)")
+
+# A second command or a file name inside unquoted task or heading text, e.g.
+# "email Sam and mark X as done" or "fix the bug in README.md in Work.md"
+AMBIGUOUS_TEXT = re.compile(
+    r"\b(?:and|then|also)\s+(?:then\s+|also\s+)?"
+    r"(?:mark|set|complete|finish|tick|check|add|update|create|move|delete|remove)\b"
+    r"|\.md\b",
+    re.IGNORECASE,
+)
+
+# Looks up the tasks currently in a vault file, for task matching and duplicates
+FileTasks = Callable[[str], List[Task]]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _clean(text: str) -> str:
+    return text.strip().lstrip("-*•").strip().rstrip(".").strip()
+
+
+class FastPathStats:
+    """Counters for how much traffic the deterministic fast path absorbs"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.handled = 0
+        self.fast_path_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def record_llm(self, elapsed: float) -> None:
+        self.llm_calls += 1
+        self.llm_seconds += elapsed
+
+    @property
+    def handled_fraction(self) -> float:
+        return self.handled / self.requests if self.requests else 0.0
+
+    @property
+    def latency_saved(self) -> Optional[float]:
+        """Estimated seconds saved, using the mean observed LLM latency"""
+        if not self.llm_calls:
+            return None
+        mean_llm = self.llm_seconds / self.llm_calls
+        return self.handled * mean_llm - self.fast_path_seconds
+
+    def report(self) -> Dict[str, Optional[float]]:
+        return {
+            "requests": self.requests,
+            "handled": self.handled,
+            "handled_fraction": self.handled_fraction,
+            "fast_path_seconds": self.fast_path_seconds,
+            "llm_calls": self.llm_calls,
+            "latency_saved_seconds": self.latency_saved,
+        }
+
+
+class IntentRecognizer:
+    """Turn formulaic debrief commands into actions without calling the LLM.
+
+    Every clause of a request must match the grammar; anything left over, or any
+    ambiguity (relative dates like "next Friday", a second command or file name in
+    the task text, unknown or duplicate tasks), makes recognize() return None so
+    the request goes to the model instead.
+
+    With file_tasks, tasks are matched against the target file as SYSTEM_PROMPT
+    asks: completions must name a unique pending task and new tasks must not
+    duplicate an existing one. A ValueError from file_tasks (e.g. an unreadable
+    path) also sends the request to the model.
+    """
+
+    def __init__(self, now: Callable[[], datetime] = datetime.now):
+        self.now = now
+        self.stats = FastPathStats()
+
+    def recognize(
+        self, request: str, file_tasks: Optional[FileTasks] = None
+    ) -> Optional[List[LLMAction]]:
+        start = time.perf_counter()
+        try:
+            action = (
+                self._complete_task(request, file_tasks)
+                or self._add_section(request)
+                or self._add_task(request, file_tasks)
+            )
+        except ValueError:
+            action = None
+        self.stats.requests += 1
+        self.stats.fast_path_seconds += time.perf_counter() - start
+        if action is None:
+            return None
+        self.stats.handled += 1
+        return [action]
+
+    def _parse_date(self, text: str) -> Optional[datetime]:
+        text = _normalize(text)
+        today = self.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if text == "today":
+            return today
+        if text == "tomorrow":
+            return today + timedelta(days=1)
+        if text == "next week":
+            return today + timedelta(weeks=1)
+        match = re.fullmatch(r"in (\d+) (day|week)s?", text)
+        if match:
+            unit = "weeks" if match.group(2) == "week" else "days"
+            return today + timedelta(**{unit: int(match.group(1))})
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            try:
+                return datetime.strptime(text, "%Y-%m-%d")
+            except ValueError:
+                # e.g. 2026-02-30
+                return None
+        if text.startswith("next "):
+            # "next Friday" means different days to different people
+            return None
+        weekday = WEEKDAYS.index(text.replace("this ", ""))
+        return today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1)
+
+    def _match_task(
+        self, content: str, known_tasks: Optional[List[Task]]
+    ) -> Optional[str]:
+        """Resolve content against existing tasks; None when no unique match"""
+        if known_tasks is None:
+            return content
+        wanted = _normalize(content)
+        pending = [t.content for t in known_tasks if not t.completed]
+        exact = [c for c in pending if _normalize(c) == wanted]
+        if len(exact) == 1:
+            return exact[0]
+        partial = [c for c in pending if wanted in _normalize(c)]
+        return partial[0] if len(partial) == 1 else None
+
+    def _complete_task(
+        self, request: str, file_tasks: Optional[FileTasks]
+    ) -> Optional[LLMAction]:
+        text = _clean(request)
+        for pattern in COMPLETE_PATTERNS:
+            match = pattern.fullmatch(text)
+            if not match:
+                continue
+            if match["bare"] and AMBIGUOUS_TEXT.search(match["bare"]):
+                return None
+            file_path = match["file"]
+            known_tasks = file_tasks(file_path) if file_tasks else None
+            task_content = self._match_task(match["task"] or match["bare"], known_tasks)
+            if task_content is None:
+                return None
+            return CompleteTaskAction(
+                action_data=TaskCompletion(
+                    file_path=file_path,
+                    task_content=task_content,
+                    completion_date=self.now(),
+                ),
+                reasoning="Matched complete-task command on the fast path",
+            )
+        return None
+
+    def _add_section(self, request: str) -> Optional[LLMAction]:
+        match = ADD_SECTION_PATTERN.fullmatch(_clean(request))
+        if not match or (match["bare"] and AMBIGUOUS_TEXT.search(match["bare"])):
+            return None
+        if match["after"]:
+            position = f"after:{match['after']}"
+        else:
+            position = (match["edge"] or "bottom").lower()
+        return AddSectionAction(
+            action_data=SectionAddition(
+                heading=(match["heading"] or match["bare"]).strip(),
+                content="",
+                file_path=match["file"],
+                position=position,
+            ),
+            reasoning="Matched add-section command on the fast path",
+        )
+
+    @staticmethod
+    def _strip_inline(
+        content: str, fields: Dict[str, Optional[str]]
+    ) -> Optional[str]:
+        """Move due/file modifiers at the end of the head into fields.
+
+        Returns the task content, or None if unquoted content is ambiguous.
+        """
+        stripped = True
+        while stripped:
+            stripped = False
+            for name, pattern in INLINE_PATTERNS.items():
+                inline = pattern.search(content)
+                if inline and not fields.get(name):
+                    fields[name] = inline[name if name == "file" else "date"]
+                    content = content[: inline.start()]
+                    stripped = True
+        quoted = re.fullmatch(_quoted("content"), content.strip())
+        if quoted:
+            return quoted["content"].strip()
+        return None if AMBIGUOUS_TEXT.search(content) else content.strip()
+
+    @staticmethod
+    def _read_clauses(clauses: List[str], fields: Dict[str, Optional[str]]) -> bool:
+        """Fill fields from modifier clauses; False if any clause is not understood"""
+        for clause in clauses:
+            for name, pattern in CLAUSE_PATTERNS.items():
+                match = pattern.fullmatch(clause)
+                if match and not fields.get(name):
+                    if name == "due":
+                        fields[name] = match["date"]
+                    elif name == "section":
+                        fields[name] = match["section"] or match["bare"]
+                    else:
+                        fields[name] = match[name]
+                    break
+            else:
+                # Unrecognised or repeated detail; let the model interpret it
+                return False
+        return True
+
+    def _add_task(
+        self, request: str, file_tasks: Optional[FileTasks]
+    ) -> Optional[LLMAction]:
+        clauses = [_clean(c) for c in CLAUSE_SPLIT.split(request.strip())]
+        clauses = [c for c in clauses if c]
+        head = ADD_TASK_HEAD.fullmatch(clauses[0]) if clauses else None
+        if not head:
+            return None
+
+        fields: Dict[str, Optional[str]] = {"priority": head["priority"]}
+        content = self._strip_inline(head["content"], fields)
+        if not self._read_clauses(clauses[1:], fields):
+            return None
+        if not content or not fields.get("file"):
+            return None
+        if file_tasks is not None and any(
+            _normalize(t.content) == _normalize(content)
+            for t in file_tasks(fields["file"])
+        ):
+            return None
+
+        due_date = None
+        if fields.get("due"):
+            due_date = self._parse_date(fields["due"])
+            if due_date is None:
+                return None
+
+        priority = fields.get("priority")
+        tags = re.findall(r"#(\w+)", fields.get("tags") or "")
+        return AddTaskAction(
+            action_data=TaskUpdate(
+                content=content,
+                priority=PRIORITY_WORDS[priority.lower()] if priority else None,
+                due_date=due_date,
+                tags=tags,
+                file_path=fields["file"],
+                section=fields.get("section"),
+            ),
+            reasoning="Matched add-task command on the fast path",
+        )
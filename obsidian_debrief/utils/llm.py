@@ -1,20 +1,139 @@
-def validate_llm_response(response_text: str) -> List[LLMAction]:
+import json
+import re
+from typing import Any, List, Optional, Tuple
 
-    # Parse JSON response
-    import json
-    actions_data = json.loads(response_text)
+from pydantic import ValidationError
 
-    # Handle single action or list of actions
-    if isinstance(actions_data, dict):
-        actions_data = [actions_data]
+from obsidian_debrief.actions import (
+    ACTION_LIST_ADAPTER,
+    ACTION_RESPONSE_ADAPTER,
+    LLMAction,
+)
+from obsidian_debrief.utils.compact import expand_actions
+
+CODE_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def _string_char(char: str, escaped: bool) -> Tuple[bool, bool]:
+    """(still inside the string, next char escaped) after char within a string"""
+    if escaped:
+        return True, False
+    if char == "\\":
+        return True, True
+    return char != '"', False
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _scan(text: str) -> Tuple[List[str], List[str], Optional[int]]:
+    """Copy text up to its first complete value, dropping trailing commas.
+
+    Returns the output, the brackets still open, and where the last complete
+    element of a top-level array ended.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    last_complete: Optional[int] = None
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            in_string, escaped = _string_char(char, escaped)
+            continue
+        if char in "}]":
+            if not stack:
+                break
+            _drop_trailing_comma(out)
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            if stack == ["["]:
+                last_complete = len(out)
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        out.append(char)
+    return out, stack, last_complete
+
+
+def repair_json(response_text: str) -> str:
+    """Apply a single pass of cheap fixes for common LLM JSON defects.
 
-    # Validate each action
-    validated_actions = []
-    for action_data in actions_data:
-        action = LLMAction(**action_data)
-        validated_actions.append(action)
+    Strips markdown fences and leading prose and drops trailing commas. A
+    truncated top-level array is cut back to its last complete element. Any
+    other truncation, such as a cut-off string or an object with no complete
+    element, raises JSONDecodeError rather than guessing at the missing text;
+    output that hit max_tokens should be re-generated.
+    """
+    text = response_text.strip()
+    fence_match = CODE_FENCE_PATTERN.search(text)
+    if fence_match:
+        text = fence_match.group(1).strip()
 
-    return validated_actions
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    text = text[min(starts):]
+    out, stack, last_complete = _scan(text)
+
+    if not stack:
+        return "".join(out)
+    if stack[0] == "[" and last_complete is not None:
+        return "".join(out[:last_complete]) + "]"
+    raise json.JSONDecodeError(
+        "Output is truncated before its first complete action", text, len(text)
+    )
+
+
+def _is_syntax_error(error: ValidationError) -> bool:
+    return any(e["type"] == "json_invalid" for e in error.errors())
+
+
+def _load_compact_json(response_text: str) -> Any:
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(response_text))
+
+
+def validate_llm_response(
+    response_text: str, compact: bool = False, max_reasoning: Optional[int] = None
+) -> List[LLMAction]:
+    """Validate raw model output into actions, repairing small JSON defects.
+
+    With compact=True the output is read in the short-key wire format from
+    utils.compact and expanded before validation. Raises ValidationError or
+    JSONDecodeError if the output is still invalid after one repair pass, or was
+    truncated; callers should treat that as the signal to re-generate.
+    """
+    if compact:
+        expanded = expand_actions(_load_compact_json(response_text), max_reasoning)
+        return ACTION_LIST_ADAPTER.validate_python(expanded)
+
+    try:
+        parsed = ACTION_RESPONSE_ADAPTER.validate_json(response_text)
+    except ValidationError as error:
+        if not _is_syntax_error(error):
+            raise
+        repaired = repair_json(response_text)
+        if repaired == response_text:
+            raise
+        parsed = ACTION_RESPONSE_ADAPTER.validate_json(repaired)
+
+    # Handle single action or list of actions
+    if isinstance(parsed, LLMAction):
+        return [parsed]
+    return parsed
 
 def structured_generation():
-    pass
\ No newline at end of file
+    pass
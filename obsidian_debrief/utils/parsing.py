@@ -0,0 +1,125 @@
+import re
+from collections import Counter
+from typing import List, Tuple
+
+from obsidian_debrief.actions import FileEdit, LineChange, content_digest
+from obsidian_debrief.utils.files import ObsidianFile, Task
+from obsidian_debrief.utils.project import parse_file_tasks, parse_task_line
+
+TAG_PATTERN = re.compile(r"(?<![\w#&/])#([\w/-]+)")
+
+TaskDelta = Tuple[List[Task], List[Task]]
+
+
+def scan_tags(lines: List[str]) -> Counter:
+    """Count inline #tags, skipping purely numeric ones as Obsidian does"""
+    counts: Counter = Counter()
+    for line in lines:
+        counts.update(tag for tag in TAG_PATTERN.findall(line) if not tag.isdigit())
+    return counts
+
+
+def _first_task_from(tasks: List[Task], line: int) -> int:
+    """Index of the first task at or after line; tasks are ordered by line"""
+    lo, hi = 0, len(tasks)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tasks[mid].line < line:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _init_line_state(file: ObsidianFile) -> None:
+    file._lines = file.content.splitlines()
+    file._tag_counts = scan_tags(file._lines)
+    # Tags the vault reports that are not inline (e.g. front matter) stay as they are
+    file._base_tags = [tag for tag in file.tags if tag not in file._tag_counts]
+
+
+def _refresh_tags(file: ObsidianFile) -> None:
+    file._tag_counts = +file._tag_counts
+    inline = [tag for tag in file._tag_counts if tag not in file._base_tags]
+    file.tags = file._base_tags + inline
+
+
+def apply_line_changes(file: ObsidianFile, changes: List[LineChange]) -> TaskDelta:
+    """Patch a file's tasks and tags in place, re-parsing only the changed lines.
+
+    Changes are applied in order, each relative to the lines left by the previous
+    one. Only changed lines are tokenized; tasks below a change that alters the
+    line count still get their line numbers shifted, an integer update per later
+    task. Returns the tasks removed from and added to file.tasks, for callers that
+    keep their own task indexes.
+    """
+    if file._lines is None:
+        _init_line_state(file)
+
+    removed: List[Task] = []
+    added: List[Task] = []
+    for change in changes:
+        old_lines = file._lines[change.start:change.end]
+        file._lines[change.start:change.end] = change.lines
+        file._tag_counts.subtract(scan_tags(old_lines))
+        file._tag_counts.update(scan_tags(change.lines))
+
+        lo = _first_task_from(file.tasks, change.start)
+        hi = _first_task_from(file.tasks, change.end)
+        shift = len(change.lines) - (change.end - change.start)
+        if shift:
+            for task in file.tasks[hi:]:
+                task.line += shift
+
+        new_tasks = []
+        for offset, line in enumerate(change.lines):
+            task = parse_task_line(line.strip())
+            if task:
+                task.line = change.start + offset
+                new_tasks.append(task)
+
+        for task in file.tasks[lo:hi]:
+            # A task added by an earlier change in this batch is simply dropped
+            if any(task is new for new in added):
+                added = [new for new in added if new is not task]
+            else:
+                removed.append(task)
+        file.tasks[lo:hi] = new_tasks
+        added.extend(new_tasks)
+
+    _refresh_tags(file)
+    return removed, added
+
+
+def _is_at(file: ObsidianFile, edit: FileEdit) -> bool:
+    """Whether file holds the contents the edit was planned against"""
+    if edit.before_digest is None:
+        # Edits journaled before digests were recorded
+        return file.content == (edit.before or "")
+    if file._digest is None:
+        file._digest = content_digest(file.content)
+    return file._digest == edit.before_digest
+
+
+def apply_file_edit(file: ObsidianFile, edit: FileEdit) -> TaskDelta:
+    """Bring a loaded file up to date with an edit written to disk.
+
+    Edits without line changes (undo, recovery) are re-parsed in full, as are
+    files that were not at the edit's starting contents, e.g. because they
+    changed outside debrief since they were loaded. A deleted file is left
+    loaded with no content.
+    """
+    after = edit.after or ""
+    if edit.changes and _is_at(file, edit):
+        delta = apply_line_changes(file, edit.changes)
+    else:
+        if file._lines is None:
+            _init_line_state(file)
+        delta = file.tasks, parse_file_tasks(after)
+        file.tasks = delta[1]
+        file._lines = after.splitlines()
+        file._tag_counts = scan_tags(file._lines)
+        _refresh_tags(file)
+    file.content = after
+    file._digest = edit.after_digest or content_digest(after)
+    return delta
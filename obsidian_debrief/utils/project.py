@@ -1,28 +1,20 @@
 import re
-from datetime import datetime
-from enum import Enum
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 
 import obsidiantools.api as otools
-from pydantic import BaseModel, Field
 
-from obsidian_debrief.utils.files import ObsidianFile, Project
+from obsidian_debrief.utils.files import (  # noqa: F401
+    ObsidianFile,
+    Project,
+    Task,
+    TaskPriority,
+)
+from obsidian_debrief.utils.index import TaskIndex, local_naive
 
-
-class TaskPriority(str, Enum):
-    HIGHEST = "⏫"
-    HIGH = "🔼"
-    MEDIUM = "🔽"
-    LOW = "⏬"
-
-class Task(BaseModel):
-    content: str
-    completed: bool = False
-    priority: Optional[TaskPriority] = None
-    due_date: Optional[datetime] = None
-    completion_date: Optional[datetime] = None
-    tags: List[str] = Field(default_factory=list)
+if TYPE_CHECKING:
+    from obsidian_debrief.actions import FileEdit
 
 
 def parse_task_line(task_line: str) -> Optional[Task]:
@@ -78,6 +70,11 @@ class ProjectLoader:
             raise ValueError(f"Vault path does not exist: {self.vault_path}")
 
         self.vault = otools.Vault(str(self.vault_path)).connect().gather()
+        # Loaded files by resolved path, shared by projects and patched by apply_edits
+        self.files: Dict[Path, ObsidianFile] = {}
+        # Projects (by main file name) each loaded file belongs to
+        self.file_projects: Dict[Path, Set[str]] = {}
+        self.task_index = TaskIndex()
 
     def _resolve_file_path(self, filename: str) -> Path:
         """Resolve the actual file path from the vault index"""
@@ -95,9 +92,11 @@ class ProjectLoader:
     def _load_file(self, filename: str) -> ObsidianFile:
         """Load a single file from the vault with proper path resolution"""
         file_path = self._resolve_file_path(filename)
+        if file_path in self.files:
+            return self.files[file_path]
         content = self._read_file_content(file_path)
 
-        return ObsidianFile(
+        self.files[file_path] = ObsidianFile(
             name=filename,
             path=file_path,
             content=content,
@@ -107,6 +106,24 @@ class ProjectLoader:
             backlinks=self.vault.get_backlinks(filename),
             wikilinks=self.vault.get_wikilinks(filename)
         )
+        return self.files[file_path]
+
+    def apply_edits(self, edits: List["FileEdit"]) -> Tuple[List[Task], List[Task]]:
+        """Patch loaded files after edits are written, re-parsing only changed lines"""
+        from obsidian_debrief.utils.parsing import apply_file_edit
+
+        removed: List[Task] = []
+        added: List[Task] = []
+        for edit in edits:
+            file = self.files.get((self.vault_path / edit.file_path).resolve())
+            if file is None:
+                continue
+            file_removed, file_added = apply_file_edit(file, edit)
+            projects = self.file_projects.get(file.path, ())
+            self.task_index.update(projects, file_removed, file_added)
+            removed.extend(file_removed)
+            added.extend(file_added)
+        return removed, added
 
     def load_project(self, main_file_name: str) -> Optional[Project]:
         """Load a project from its main file"""
@@ -123,6 +140,11 @@ class ProjectLoader:
                 working_file = self._load_file(linked_file)
                 working_files.append(working_file)
 
+        for file in [main_file, *working_files]:
+            self.file_projects.setdefault(file.path, set()).add(main_file.name)
+            for task in file.tasks:
+                self.task_index.add(main_file.name, task)
+
         front_matter = main_file.front_matter
         return Project(
             main_file=main_file,
@@ -133,6 +155,40 @@ class ProjectLoader:
             due_date=front_matter.get('due_date')
         )
 
+    def tasks_due_between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        priorities: Optional[Iterable[Optional[TaskPriority]]] = None,
+        projects: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, Task]]:
+        """Pending (project, task) pairs with start <= due date < end, earliest first"""
+        return self.task_index.query(start, end, priorities, projects)
+
+    def overdue_tasks(
+        self,
+        as_of: Optional[datetime] = None,
+        priorities: Optional[Iterable[Optional[TaskPriority]]] = None,
+        projects: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, Task]]:
+        """Pending tasks due before the start of as_of's day (default today)"""
+        as_of = local_naive(as_of) if as_of else datetime.now()
+        today = as_of.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.task_index.query(
+            end=today, priorities=priorities, projects=projects
+        )
+
+    def tasks_due_within(
+        self,
+        days: int,
+        priorities: Optional[Iterable[Optional[TaskPriority]]] = None,
+        projects: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, Task]]:
+        """Pending tasks due from today through the next `days` days"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = today + timedelta(days=days + 1)
+        return self.task_index.query(today, end, priorities, projects)
+
     def load_all_projects(self) -> List[Project]:
         """Load all projects from the vault"""
         projects = []
@@ -147,9 +203,10 @@ class ProjectLoader:
 def parse_file_tasks(content: str) -> List[Task]:
     """Parse all tasks from file content"""
     tasks = []
-    for line in content.splitlines():
+    for i, line in enumerate(content.splitlines()):
         task = parse_task_line(line.strip())
         if task:
+            task.line = i
             tasks.append(task)
     return tasks
 
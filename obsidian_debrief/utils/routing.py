@@ -0,0 +1,281 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, List, Optional
+
+import openai
+import requests
+from openai import OpenAI
+from pydantic import BaseModel, Field
+
+from obsidian_debrief import config
+
+
+class EndpointConfig(BaseModel):
+    """An OpenAI-compatible inference server"""
+    base_url: str
+    model: str = config.LLM_MODEL
+    api_key: str = config.LLM_API_KEY
+    max_concurrency: int = Field(default=config.LLM_MAX_CONCURRENCY, ge=1)
+
+
+def default_client_factory(endpoint: EndpointConfig) -> Any:
+    return OpenAI(base_url=endpoint.base_url, api_key=endpoint.api_key)
+
+
+def default_health_check(endpoint: EndpointConfig, timeout: float) -> bool:
+    """Probe the endpoint's /models route"""
+    try:
+        response = requests.get(
+            f"{endpoint.base_url.rstrip('/')}/models",
+            headers={"Authorization": f"Bearer {endpoint.api_key}"},
+            timeout=timeout,
+        )
+    except requests.RequestException:
+        return False
+    return response.ok
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """Whether an error says the endpoint is down rather than the request is bad.
+
+    Connection errors, timeouts and 5xx responses count against the endpoint, also
+    when wrapped (e.g. by instructor). Anything else, such as a response that fails
+    validation or a 4xx, would fail the same way on any endpoint.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class Endpoint:
+    """Runtime routing state for a single endpoint"""
+
+    def __init__(
+        self, endpoint_config: EndpointConfig, client: Any, latency_window: int
+    ):
+        self.config = endpoint_config
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.retry_at = 0.0
+        self.probing = False
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.slots = threading.BoundedSemaphore(endpoint_config.max_concurrency)
+
+    @property
+    def due_for_probe(self) -> bool:
+        if self.healthy or self.probing:
+            return False
+        return time.monotonic() >= self.retry_at
+
+    @property
+    def saturated(self) -> bool:
+        return self.outstanding >= self.config.max_concurrency
+
+    @property
+    def mean_latency(self) -> float:
+        # Unmeasured endpoints sort first so new boxes get traffic
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+
+class EndpointPool:
+    """Route chat completions across several OpenAI-compatible endpoints.
+
+    Requests go to the healthy endpoint with the fewest outstanding requests (ties
+    broken by recent mean latency), each endpoint capped at its own
+    max_concurrency. When hedge_percentile is set and a request runs past that
+    percentile of recent latencies, a duplicate is sent to another endpoint and
+    whichever answers first wins.
+
+    Transport errors and 5xx responses mark an endpoint down and the request fails
+    over; once unhealthy_backoff has passed the endpoint is re-admitted only after
+    a successful health check.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[EndpointConfig],
+        client_factory: Callable[[EndpointConfig], Any] = default_client_factory,
+        health_check: Callable[[EndpointConfig, float], bool] = default_health_check,
+        hedge_percentile: Optional[float] = None,
+        min_hedge_samples: int = 20,
+        latency_window: int = 200,
+        unhealthy_backoff: float = 30.0,
+        health_timeout: float = 2.0,
+    ):
+        if not endpoints:
+            raise ValueError("EndpointPool requires at least one endpoint")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError(
+                f"hedge_percentile must be in (0, 100): {hedge_percentile}"
+            )
+
+        self.endpoints = [
+            Endpoint(endpoint, client_factory(endpoint), latency_window)
+            for endpoint in endpoints
+        ]
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.unhealthy_backoff = unhealthy_backoff
+        self.health_check = health_check
+        self.health_timeout = health_timeout
+        self.hedged_requests = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(e.config.max_concurrency for e in self.endpoints) + 1,
+            thread_name_prefix="llm-endpoint",
+        )
+
+    @classmethod
+    def from_config(cls, **kwargs: Any) -> "EndpointPool":
+        """Build a pool from the DEBRIEF_LLM_* environment settings"""
+        kwargs.setdefault("hedge_percentile", config.LLM_HEDGE_PERCENTILE)
+        endpoints = [EndpointConfig(base_url=url) for url in config.LLM_ENDPOINTS]
+        return cls(endpoints, **kwargs)
+
+    def _probe(self, endpoint: Endpoint) -> bool:
+        healthy = self.health_check(endpoint.config, self.health_timeout)
+        with self._lock:
+            endpoint.probing = False
+            if healthy:
+                endpoint.healthy = True
+            else:
+                self._mark_unhealthy(endpoint)
+        return healthy
+
+    def check_health(self) -> List[bool]:
+        """Probe every endpoint and update its health"""
+        with self._lock:
+            for endpoint in self.endpoints:
+                endpoint.probing = True
+        return [self._probe(endpoint) for endpoint in self.endpoints]
+
+    def _readmit(self) -> None:
+        """Health check endpoints whose backoff has expired before routing to them"""
+        with self._lock:
+            due = [e for e in self.endpoints if e.due_for_probe]
+            for endpoint in due:
+                endpoint.probing = True
+        for endpoint in due:
+            self._probe(endpoint)
+
+    def _mark_unhealthy(self, endpoint: Endpoint) -> None:
+        endpoint.healthy = False
+        endpoint.retry_at = time.monotonic() + self.unhealthy_backoff
+
+    def _acquire(
+        self, exclude: Optional[List[Endpoint]] = None, block: bool = True
+    ) -> Optional[Endpoint]:
+        """Reserve a slot on the least loaded endpoint, or None if none is eligible"""
+        exclude = exclude or []
+        self._readmit()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.healthy]
+            if not candidates:
+                # Everything is marked down; trying one beats failing outright
+                candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            idle = [e for e in candidates if not e.saturated]
+            if not idle and not block:
+                return None
+            endpoint = min(
+                idle or candidates, key=lambda e: (e.outstanding, e.mean_latency)
+            )
+            endpoint.outstanding += 1
+        endpoint.slots.acquire()
+        return endpoint
+
+    def _release(self, endpoint: Endpoint) -> None:
+        endpoint.slots.release()
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is None or len(self.endpoints) < 2:
+            return None
+        with self._lock:
+            samples = sorted(lat for e in self.endpoints for lat in e.latencies)
+        if len(samples) < self.min_hedge_samples:
+            return None
+        rank = int(len(samples) * self.hedge_percentile / 100)
+        index = min(len(samples) - 1, rank)
+        return samples[index]
+
+    def _call(self, endpoint: Endpoint, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            response = endpoint.client.chat.completions.create(
+                model=endpoint.config.model, **kwargs
+            )
+        except Exception as error:
+            if is_endpoint_failure(error):
+                with self._lock:
+                    self._mark_unhealthy(endpoint)
+            raise
+        finally:
+            self._release(endpoint)
+        with self._lock:
+            endpoint.latencies.append(time.perf_counter() - start)
+            endpoint.healthy = True
+        return response
+
+    def _submit(
+        self, tried: List[Endpoint], kwargs: dict, block: bool = True
+    ) -> Optional[Future]:
+        endpoint = self._acquire(exclude=tried, block=block)
+        if endpoint is None:
+            return None
+        tried.append(endpoint)
+        return self._executor.submit(self._call, endpoint, kwargs)
+
+    def create(self, **kwargs: Any) -> Any:
+        """Run chat.completions.create on the pool; model is set per endpoint"""
+        tried: List[Endpoint] = []
+        first = self._submit(tried, kwargs)
+        if first is None:
+            raise RuntimeError("No LLM endpoints available")
+        pending = {first}
+        hedge_delay = self._hedge_delay()
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = wait(
+                pending, timeout=hedge_delay, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # Primary is slower than the hedge percentile; race a duplicate
+                hedge_delay = None
+                hedge = self._submit(tried, kwargs, block=False)
+                if hedge is not None:
+                    with self._lock:
+                        self.hedged_requests += 1
+                    pending.add(hedge)
+                continue
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                if not is_endpoint_failure(error):
+                    # The request itself is bad; another endpoint would not help
+                    raise error
+                last_error = error
+            if not pending:
+                # Failed outright: fail over to an endpoint not yet tried
+                retry = self._submit(tried, kwargs)
+                if retry is not None:
+                    pending.add(retry)
+
+        assert last_error is not None
+        raise last_error
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
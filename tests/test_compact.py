@@ -0,0 +1,118 @@
+import json
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from obsidian_debrief.actions import (
+    AddSectionAction,
+    AddTaskAction,
+    CompleteTaskAction,
+    Priority,
+    SectionAddition,
+    SummaryUpdate,
+    TaskCompletion,
+    TaskUpdate,
+    UpdateSummaryAction,
+    UpdateTaskAction,
+)
+from obsidian_debrief.utils.compact import compress_action
+from obsidian_debrief.utils.llm import validate_llm_response
+
+ACTIONS = [
+    AddTaskAction(
+        action_data=TaskUpdate(
+            content="write report",
+            priority=Priority.HIGHEST,
+            due_date=datetime(2026, 11, 3),
+            tags=["work", "q4"],
+            file_path="Projects/Report.md",
+            section="Tasks",
+        ),
+        reasoning="mentioned as urgent",
+    ),
+    UpdateTaskAction(
+        action_data=TaskUpdate(
+            content="review draft",
+            priority=Priority.LOW,
+            due_date=datetime(2026, 11, 3, 14, 30),
+            file_path="Projects/Report.md",
+        ),
+        reasoning="moved to the afternoon",
+    ),
+    UpdateSummaryAction(
+        action_data=SummaryUpdate(
+            content="On track for launch.",
+            file_path="Projects/Report.md",
+            replace_existing=True,
+        ),
+        reasoning="status changed",
+    ),
+    CompleteTaskAction(
+        action_data=TaskCompletion(
+            task_content="call Sam",
+            file_path="Projects/Report.md",
+            completion_date=datetime(2026, 10, 19),
+        ),
+        reasoning="done today",
+    ),
+    AddSectionAction(
+        action_data=SectionAddition(
+            heading="Risks",
+            content="- vendor delay",
+            file_path="Projects/Report.md",
+            position="after:Tasks",
+        ),
+        reasoning="new risk raised",
+    ),
+]
+
+
+def round_trip(actions, **kwargs):
+    compact = [compress_action(action) for action in actions]
+    return validate_llm_response(json.dumps(compact), compact=True, **kwargs)
+
+
+def test_every_action_type_round_trips():
+    assert round_trip(ACTIONS) == ACTIONS
+
+
+def test_wire_format_uses_short_codes():
+    add, update, summary = (compress_action(a) for a in ACTIONS[:3])
+
+    assert add["d"]["p"] == 1
+    assert add["d"]["d"] == "2026-11-03"
+    assert update["d"]["d"] == "2026-11-03T14:30:00"
+    assert summary["d"]["x"] == 1
+
+
+def test_quoted_priority_codes():
+    text = '{"t":"at","d":{"c":"a","f":"P.md","p":"2"},"r":"r"}'
+
+    (action,) = validate_llm_response(text, compact=True)
+    assert action.action_data.priority == Priority.HIGH
+
+
+def test_reasoning_is_truncated():
+    (action,) = round_trip(ACTIONS[:1], max_reasoning=9)
+
+    assert action.reasoning == "mentioned"
+    assert action.action_data == ACTIONS[0].action_data
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[{"t":"at","d":["x"]}]',
+        "5",
+        '"at"',
+        '{"t":["at"]}',
+        '{"t":"at","d":{"c":"a","f":"P.md","p":[1]}}',
+        '{"t":"at","d":{"c":"a","f":"P.md","p":true}}',
+        '{"t":"at","d":{"c":"a","f":"P.md"},"r":5}',
+    ],
+)
+def test_wrong_shape_fails_validation(text):
+    # A ValidationError is what the caller re-generates on
+    with pytest.raises(ValidationError):
+        validate_llm_response(text, compact=True, max_reasoning=10)
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from obsidian_debrief.utils.files import Task, TaskPriority
+from obsidian_debrief.utils.index import TaskIndex
+
+
+def build_index():
+    index = TaskIndex()
+    tasks = {
+        "late": Task(content="late", due_date=datetime(2026, 1, 5)),
+        "urgent": Task(
+            content="urgent",
+            due_date=datetime(2026, 1, 10),
+            priority=TaskPriority.HIGHEST,
+        ),
+        "done": Task(content="done", due_date=datetime(2026, 1, 1), completed=True),
+        "undated": Task(content="undated"),
+        "other": Task(content="other", due_date=datetime(2026, 1, 7)),
+    }
+    for name in ("late", "urgent", "done", "undated"):
+        index.add("Proj", tasks[name])
+    index.add("Other", tasks["other"])
+    # A working file shared by both projects
+    index.add("Other", tasks["urgent"])
+    return index, tasks
+
+
+def contents(results):
+    return [task.content for _, task in results]
+
+
+def test_query_orders_by_due_date_and_skips_unindexable_tasks():
+    index, _ = build_index()
+
+    assert contents(index.query()) == ["late", "other", "urgent"]
+    assert contents(index.query(end=datetime(2026, 1, 7))) == ["late"]
+    assert contents(index.query(start=datetime(2026, 1, 7), limit=1)) == ["other"]
+
+
+def test_query_filters_by_priority_and_project():
+    index, _ = build_index()
+
+    assert contents(index.query(priorities=[TaskPriority.HIGHEST])) == ["urgent"]
+    assert contents(index.query(projects=["Other"])) == ["other", "urgent"]
+    assert contents(index.query(priorities=[None], projects=["Proj"])) == ["late"]
+
+
+def test_update_replaces_tasks():
+    index, tasks = build_index()
+    moved = Task(content="late", due_date=datetime(2026, 2, 1))
+
+    index.update(["Proj"], removed=[tasks["late"]], added=[moved])
+
+    assert contents(index.query()) == ["other", "urgent", "late"]
+    assert len(index) == 3
+
+
+def test_aware_bounds_compare_in_local_time():
+    index, _ = build_index()
+    start = datetime(2026, 1, 6, tzinfo=timezone.utc).astimezone()
+
+    assert contents(index.query(start=start)) == ["other", "urgent"]
@@ -0,0 +1,169 @@
+from datetime import datetime
+
+import pytest
+
+from obsidian_debrief.actions import (
+    AddSectionAction,
+    AddTaskAction,
+    CompleteTaskAction,
+    Priority,
+)
+from obsidian_debrief.utils.files import Task
+from obsidian_debrief.utils.intents import IntentRecognizer
+
+# A Monday
+NOW = datetime(2026, 10, 19, 9, 30)
+
+
+@pytest.fixture
+def recognizer():
+    return IntentRecognizer(now=lambda: NOW)
+
+
+def file_tasks(tasks):
+    """A file_tasks lookup over {file_path: [Task, ...]}"""
+    return lambda file_path: tasks.get(file_path, [])
+
+
+def data(actions):
+    (action,) = actions
+    return action.action_data
+
+
+def test_formulaic_requests_skip_the_llm(recognizer):
+    add = recognizer.recognize(
+        "Add a high priority task to review the API documentation, due next "
+        "week, add it to the Development/Tasks.md file"
+    )
+    complete = recognizer.recognize(
+        "Mark the task 'Initial research' as complete in Research/Planning.md"
+    )
+    section = recognizer.recognize(
+        "Add a new section called 'Dependencies' to the Technical-Specs.md file"
+    )
+
+    assert isinstance(add[0], AddTaskAction)
+    assert data(add).content == "review the API documentation"
+    assert data(add).priority == Priority.HIGH
+    assert data(add).due_date == datetime(2026, 10, 26)
+    assert data(add).file_path == "Development/Tasks.md"
+
+    assert isinstance(complete[0], CompleteTaskAction)
+    assert data(complete).task_content == "Initial research"
+    assert data(complete).file_path == "Research/Planning.md"
+    assert data(complete).completion_date == NOW
+
+    assert isinstance(section[0], AddSectionAction)
+    assert data(section).heading == "Dependencies"
+    assert data(section).position == "bottom"
+
+
+def test_summary_request_goes_to_the_llm(recognizer):
+    assert recognizer.recognize(
+        "Update the main project file Projects/API-Integration.md with a summary "
+        "of our progress this week"
+    ) is None
+
+
+@pytest.mark.parametrize(
+    "when, expected",
+    [
+        ("Friday", datetime(2026, 10, 23)),
+        ("this Wednesday", datetime(2026, 10, 21)),
+        # Today's weekday means a week from today
+        ("Monday", datetime(2026, 10, 26)),
+        ("in 3 days", datetime(2026, 10, 22)),
+        ("in 2 weeks", datetime(2026, 11, 2)),
+        ("2026-11-02", datetime(2026, 11, 2)),
+    ],
+)
+def test_due_dates(recognizer, when, expected):
+    actions = recognizer.recognize(f"Add a task to call Sam due {when} in Work.md")
+
+    assert data(actions).due_date == expected
+    assert data(actions).content == "call Sam"
+
+
+@pytest.mark.parametrize(
+    "request_text",
+    [
+        # Not a real date
+        "Add a task to call Sam due 2026-02-30 in Work.md",
+        # Relative weekdays mean different days to different people
+        "Add a task to call Sam due next Friday in Work.md",
+        # A second command hidden in the task text
+        "Add a task to email Sam and mark budget as done in Work.md",
+        "Mark fix the bug in README.md as done in Work.md",
+        # Repeated clauses
+        "Add a task to call Sam, due Friday, due Monday, in Work.md",
+        "Add a task to call Sam, in Work.md, in Home.md",
+        # Unrecognised detail
+        "Add a task to call Sam, in Work.md, when the budget is approved",
+    ],
+)
+def test_ambiguous_requests_go_to_the_llm(recognizer, request_text):
+    assert recognizer.recognize(request_text) is None
+
+
+def test_quoted_task_text_is_taken_literally(recognizer):
+    actions = recognizer.recognize(
+        "Add a task called 'email Sam and mark budget as done' in Work.md"
+    )
+
+    assert data(actions).content == "email Sam and mark budget as done"
+
+
+def test_tasks_are_matched_against_the_file(recognizer):
+    tasks = file_tasks({
+        "Work.md": [
+            Task(content="Call Sam about the budget"),
+            Task(content="Review draft"),
+            Task(content="Review slides"),
+            Task(content="Ship release", completed=True),
+        ],
+    })
+
+    def complete(task):
+        return recognizer.recognize(f"Complete '{task}' in Work.md", tasks)
+
+    def add(task):
+        return recognizer.recognize(f"Add a task to {task} in Work.md", tasks)
+
+    # Partial matches resolve to the task as written in the file
+    assert data(complete("call sam")).task_content == "Call Sam about the budget"
+    # Unknown, ambiguous and already completed tasks go to the model
+    assert complete("water plants") is None
+    assert complete("review") is None
+    assert complete("ship release") is None
+
+    assert add("review draft") is None
+    assert data(add("review notes")).content == "review notes"
+
+
+def test_unreadable_file_goes_to_the_llm(recognizer):
+    def unreadable(file_path):
+        raise ValueError(f"{file_path} is outside the vault")
+
+    assert recognizer.recognize("Complete 'x' in Work.md", unreadable) is None
+
+
+def test_stats_track_fraction_and_latency_saved(recognizer):
+    stats = recognizer.stats
+    assert stats.latency_saved is None
+
+    recognizer.recognize("Add a task to call Sam in Work.md")
+    recognizer.recognize("Complete 'call Sam' in Work.md")
+    recognizer.recognize("Summarise this week's progress in Work.md")
+    recognizer.recognize("Add a task to email Sam and mark budget as done in Work.md")
+    stats.record_llm(2.0)
+    stats.record_llm(4.0)
+
+    assert stats.requests == 4
+    assert stats.handled == 2
+    assert stats.handled_fraction == 0.5
+    # Two handled requests at the mean LLM latency, less time spent matching
+    assert stats.latency_saved == pytest.approx(2 * 3.0 - stats.fast_path_seconds)
+    assert 0 < stats.fast_path_seconds < 1
+    report = stats.report()
+    assert report["handled_fraction"] == 0.5
+    assert report["llm_calls"] == 2
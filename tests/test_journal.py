@@ -0,0 +1,256 @@
+import errno
+import threading
+import time
+
+import pytest
+
+from obsidian_debrief import journal as journal_module
+from obsidian_debrief.actions import ActionExecutor, AddTaskAction, TaskUpdate
+from obsidian_debrief.journal import ActionJournal, BatchApplyError
+
+
+def add_task(content, file_path="Tasks.md"):
+    return AddTaskAction(
+        action_data=TaskUpdate(content=content, file_path=file_path),
+        reasoning="test",
+    )
+
+
+@pytest.fixture
+def executor(tmp_path):
+    return ActionExecutor(str(tmp_path))
+
+
+@pytest.fixture
+def journal(executor):
+    return ActionJournal(executor)
+
+
+def read(executor, file_path="Tasks.md"):
+    return executor.read_file(file_path)
+
+
+def test_concurrent_commits_share_one_fsync(journal, monkeypatch):
+    writers = 8
+    fsyncs = []
+    real_fsync = journal_module.os.fsync
+
+    def slow_fsync(fd):
+        if not fsyncs:
+            # Hold the first flush until every writer has queued its record
+            deadline = time.monotonic() + 5
+            while journal._queued < writers and time.monotonic() < deadline:
+                time.sleep(0.001)
+        fsyncs.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, "fsync", slow_fsync)
+    batches = []
+    threads = [
+        threading.Thread(
+            target=lambda i=i: batches.append(
+                journal.commit([add_task(f"task {i}", f"File{i}.md")])
+            )
+        )
+        for i in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(batches) == writers
+    # The first leader flushes its own record; the next flushes everyone else's
+    assert len(fsyncs) <= 2
+    committed, _ = journal._batches()
+    assert set(committed) == {batch.batch_id for batch in batches}
+
+
+def test_recover_rolls_forward_after_crash(executor, journal):
+    batch = journal.commit([add_task("write report")])
+    assert read(executor) is None
+
+    # Restart: a fresh journal over the same file
+    result = ActionJournal(executor).recover()
+
+    assert result.rewritten == ["Tasks.md"]
+    assert read(executor) == batch.edits[0].after
+    assert ActionJournal(executor).recover().rewritten == []
+
+
+def test_recover_undo_rolls_back_unapplied_batches(executor, journal):
+    first = journal.execute([add_task("first")])
+    second = journal.commit([add_task("second")])
+    # Crash after writing the file but before the applied marker
+    executor.write_file("Tasks.md", second.edits[0].after)
+
+    result = ActionJournal(executor).recover(undo=True)
+
+    assert result.undone == [second.batch_id]
+    assert result.rewritten == ["Tasks.md"]
+    assert read(executor) == first.edits[0].after
+
+
+def test_recover_reports_external_edits_as_conflicts(executor, journal):
+    executor.write_file("Tasks.md", "- [ ] existing\n")
+    journal.commit([add_task("new")])
+    executor.write_file("Tasks.md", "edited outside debrief\n")
+
+    result = ActionJournal(executor).recover()
+
+    assert result.conflicts == ["Tasks.md"]
+    assert read(executor) == "edited outside debrief\n"
+
+
+def test_undo_requires_reverse_order(executor, journal):
+    executor.write_file("Tasks.md", "- [ ] existing\n")
+    first = journal.execute([add_task("first")])
+    second = journal.execute([add_task("second")])
+
+    with pytest.raises(ValueError, match="undo it first"):
+        journal.undo(first.batch_id)
+    journal.undo(second.batch_id)
+    journal.undo(first.batch_id)
+
+    assert read(executor) == "- [ ] existing\n"
+    with pytest.raises(ValueError, match="already undone"):
+        journal.undo(first.batch_id)
+
+
+def test_undo_refuses_externally_edited_file(executor, journal):
+    batch = journal.execute([add_task("first")])
+    executor.write_file("Tasks.md", "edited outside debrief\n")
+
+    with pytest.raises(ValueError, match="changed since"):
+        journal.undo(batch.batch_id)
+
+
+def test_failed_apply_drops_dependent_batches(executor, journal, monkeypatch):
+    write_file = executor.write_file
+
+    def failing_write(file_path, content, durable=False):
+        if file_path == "Broken.md":
+            raise OSError("disk full")
+        write_file(file_path, content, durable)
+
+    monkeypatch.setattr(executor, "write_file", failing_write)
+    failed = journal.commit([add_task("a", "Tasks.md"), add_task("b", "Broken.md")])
+    dependent = journal.commit([add_task("c", "Tasks.md")])
+    independent = journal.commit([add_task("d", "Other.md")])
+
+    with pytest.raises(BatchApplyError) as error:
+        journal.apply(independent)
+    assert error.value.batch_ids == [failed.batch_id, dependent.batch_id]
+    # Files the failed batch had already written are restored
+    assert read(executor) is None
+
+    journal.apply(independent)
+    assert read(executor, "Other.md") == independent.edits[0].after
+    # The queue is not wedged: new commits plan against disk and checkpoint works
+    retry = journal.execute([add_task("c", "Tasks.md")])
+    assert retry.edits[0].before is None
+    journal.checkpoint()
+    assert ActionJournal(executor).recover().rewritten == []
+
+
+def test_checkpoint_runs_once_journal_is_large(executor):
+    journal = ActionJournal(executor, checkpoint_bytes=1)
+    journal.execute([add_task("first")])
+
+    assert journal.journal_path.read_text(encoding="utf-8") == ""
+    assert read(executor) is not None
+
+
+def test_undo_and_recover_call_on_apply(executor):
+    notified = []
+    journal = ActionJournal(executor, on_apply=notified.append)
+    batch = journal.execute([add_task("first")])
+    journal.undo(batch.batch_id)
+
+    assert [b.batch_id for b in notified] == [batch.batch_id, batch.batch_id]
+    (undo_edit,) = notified[1].edits
+    assert (undo_edit.before, undo_edit.after) == (batch.edits[0].after, None)
+
+    pending = journal.commit([add_task("second")])
+    notified.clear()
+    ActionJournal(executor, on_apply=notified.append).recover()
+    (recover_edit,) = notified[0].edits
+    assert recover_edit.after == pending.edits[0].after
+
+
+def failing_fsync(monkeypatch, fail_on):
+    """Make the fsync calls numbered in fail_on raise EIO"""
+    calls = []
+    real_fsync = journal_module.os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        if len(calls) in fail_on:
+            raise OSError(errno.EIO, "I/O error")
+        real_fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, "fsync", fsync)
+    return calls
+
+
+def test_failed_commit_never_reaches_the_vault(executor, journal, monkeypatch):
+    failing_fsync(monkeypatch, fail_on={1})
+
+    with pytest.raises(BatchApplyError):
+        journal.commit([add_task("rejected")])
+    batch = journal.execute([add_task("accepted")])
+
+    assert "rejected" not in read(executor)
+    assert "accepted" in read(executor)
+    assert batch.edits[0].before is None
+    committed, _ = ActionJournal(executor)._batches()
+    assert list(committed) == [batch.batch_id]
+
+
+def test_failed_group_flush_fails_every_waiter(executor, journal, monkeypatch):
+    writers = 6
+    calls = failing_fsync(monkeypatch, fail_on={2})
+    fsync = journal_module.os.fsync
+
+    def hold_first_fsync(fd):
+        if not calls:
+            # Hold the first flush until every writer has queued its record
+            deadline = time.monotonic() + 5
+            while journal._queued < writers and time.monotonic() < deadline:
+                time.sleep(0.001)
+        fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, "fsync", hold_first_fsync)
+    results = []
+
+    def commit(i):
+        try:
+            results.append(journal.commit([add_task(f"task {i}", f"File{i}.md")]))
+        except BatchApplyError as error:
+            results.append(error)
+
+    threads = [threading.Thread(target=commit, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The first leader flushes its own record; the group behind it fails together
+    batches = [r for r in results if not isinstance(r, BatchApplyError)]
+    assert len(results) == writers
+    assert len(batches) == 1
+    result = ActionJournal(executor).recover()
+    assert result.rewritten == [batches[0].edits[0].file_path]
+
+
+def test_torn_record_is_trimmed_before_new_commits(executor, journal):
+    journal.commit([add_task("a", "A.md")])
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"type": "commit", "batch_id": "to')
+
+    restarted = ActionJournal(executor)
+    assert restarted.recover().rewritten == ["A.md"]
+    batch = restarted.commit([add_task("b", "B.md")])
+
+    assert ActionJournal(executor).recover().rewritten == ["B.md"]
+    assert read(executor, "B.md") == batch.edits[0].after
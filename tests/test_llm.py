@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from obsidian_debrief.actions import (
+    ActionType,
+    AddTaskAction,
+    CompleteTaskAction,
+    UpdateSummaryAction,
+)
+from obsidian_debrief.utils.llm import repair_json, validate_llm_response
+
+ADD_TASK = {
+    "action_type": "add_task",
+    "action_data": {"content": "write report", "file_path": "Project.md"},
+    "reasoning": "mentioned in the debrief",
+}
+COMPLETE_TASK = {
+    "action_type": "complete_task",
+    "action_data": {"task_content": "call Sam", "file_path": "Project.md"},
+    "reasoning": "done today",
+}
+
+
+def test_strips_fences_and_prose():
+    text = "Here are the actions:\n```json\n" + json.dumps([ADD_TASK]) + "\n```"
+
+    assert json.loads(repair_json(text)) == [ADD_TASK]
+    (action,) = validate_llm_response(text)
+    assert isinstance(action, AddTaskAction)
+
+
+def test_drops_trailing_commas():
+    text = '[{"action_type": "add_task", "action_data": {"content": "a", ' \
+        '"file_path": "P.md", "tags": ["x", ],}, "reasoning": "r",},]'
+
+    (action,) = validate_llm_response(text)
+    assert action.action_data.tags == ["x"]
+
+
+def test_truncated_array_is_cut_back_to_last_complete_element():
+    complete = json.dumps([ADD_TASK, COMPLETE_TASK])
+    text = complete[:-1] + ', {"action_type": "add_task", "action_data": {"con'
+
+    assert json.loads(repair_json(text)) == [ADD_TASK, COMPLETE_TASK]
+    actions = validate_llm_response(text)
+    assert [type(a) for a in actions] == [AddTaskAction, CompleteTaskAction]
+
+
+def test_truncated_string_is_not_salvaged():
+    summary = {
+        "action_type": "update_summary",
+        "action_data": {
+            "content": "The project is on track and the launch",
+            "file_path": "Project.md",
+            "replace_existing": True,
+        },
+        "reasoning": "new status",
+    }
+    text = json.dumps(summary)
+    cut = text[:text.index("launch") + 3]
+
+    with pytest.raises(ValueError):
+        repair_json(cut)
+    with pytest.raises(ValueError):
+        validate_llm_response(cut)
+    # A top-level array with no complete element is no better
+    with pytest.raises(ValueError):
+        validate_llm_response("[" + cut)
+
+
+def test_single_object_or_list():
+    (single,) = validate_llm_response(json.dumps(ADD_TASK))
+    listed = validate_llm_response(json.dumps([ADD_TASK, COMPLETE_TASK]))
+
+    assert isinstance(single, AddTaskAction)
+    assert [a.action_type for a in listed] == [
+        ActionType.ADD_TASK,
+        ActionType.COMPLETE_TASK,
+    ]
+
+
+def test_discriminator_rejects_mismatched_action_data():
+    # Valid TaskCompletion data, but update_summary requires SummaryUpdate
+    wrong = dict(COMPLETE_TASK, action_type="update_summary")
+
+    with pytest.raises(ValidationError) as error:
+        validate_llm_response(json.dumps([wrong]))
+    # Only the tagged model is tried, not every member of the union
+    locs = [e["loc"][2:] for e in error.value.errors() if len(e["loc"]) > 2]
+    assert locs == [("update_summary", "action_data", "content")]
+
+    summary = dict(
+        wrong, action_data={"content": "status", "file_path": "Project.md"}
+    )
+    (action,) = validate_llm_response(json.dumps([summary]))
+    assert isinstance(action, UpdateSummaryAction)
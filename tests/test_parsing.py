@@ -0,0 +1,128 @@
+from datetime import datetime
+from pathlib import Path
+
+from obsidian_debrief.actions import (
+    ActionExecutor,
+    AddSectionAction,
+    AddTaskAction,
+    CompleteTaskAction,
+    Priority,
+    SectionAddition,
+    TaskCompletion,
+    TaskUpdate,
+)
+from obsidian_debrief.utils.files import ObsidianFile
+from obsidian_debrief.utils.parsing import apply_file_edit, scan_tags
+from obsidian_debrief.utils.project import parse_file_tasks
+
+CONTENT = """---
+status: active
+---
+# Project #project
+
+## Tasks
+- [ ] existing task #work 📅 2026-10-01
+- [ ] another task ⏫
+
+## Notes
+Some notes #idea
+"""
+
+
+def load(content=CONTENT):
+    return ObsidianFile(
+        name="Project",
+        path=Path("Project.md"),
+        content=content,
+        tasks=parse_file_tasks(content),
+        tags=list(scan_tags(content.splitlines())),
+    )
+
+
+def snapshot(tasks):
+    return [(t.line, t.content, t.completed, t.priority, t.due_date) for t in tasks]
+
+
+def confirm_all_actions():
+    actions = []
+    for i in range(60):
+        actions.append(AddTaskAction(
+            action_data=TaskUpdate(
+                content=f"task {i}",
+                priority=Priority.HIGH if i % 3 else None,
+                due_date=datetime(2026, 11, 1 + i % 28),
+                tags=["batch"],
+                file_path="Project.md",
+                section="Tasks" if i % 2 else "Later",
+            ),
+            reasoning="test",
+        ))
+    for i in range(0, 60, 2):
+        actions.append(CompleteTaskAction(
+            action_data=TaskCompletion(
+                file_path="Project.md",
+                task_content=f"task {i}",
+                completion_date=datetime(2026, 10, 19),
+            ),
+            reasoning="test",
+        ))
+    for i in range(10):
+        actions.append(AddSectionAction(
+            action_data=SectionAddition(
+                heading=f"Section {i}",
+                content=f"- [ ] section task {i} #s{i}",
+                file_path="Project.md",
+                position="top" if i % 2 else "after:Tasks",
+            ),
+            reasoning="test",
+        ))
+    return actions
+
+
+def test_incremental_patch_matches_full_parse(tmp_path):
+    executor = ActionExecutor(str(tmp_path))
+    complete_existing = CompleteTaskAction(
+        action_data=TaskCompletion(file_path="Project.md", task_content="existing"),
+        reasoning="test",
+    )
+    (edit,) = executor.plan_edits(
+        confirm_all_actions() + [complete_existing], {"Project.md": CONTENT}
+    )
+    assert len(edit.changes) == 101
+
+    file = load()
+    removed, added = apply_file_edit(file, edit)
+
+    assert file.content == edit.after
+    assert snapshot(file.tasks) == snapshot(parse_file_tasks(edit.after))
+    assert set(file.tags) == set(scan_tags(edit.after.splitlines()))
+    # Tasks added and completed within the batch are only reported once, as added
+    assert [t.content for t in removed] == ["existing task"]
+    assert len(added) == 60 + 10 + 1
+
+
+def test_inverse_edit_restores_tasks(tmp_path):
+    executor = ActionExecutor(str(tmp_path))
+    (edit,) = executor.plan_edits(
+        confirm_all_actions()[:5], {"Project.md": CONTENT}
+    )
+    file = load()
+    apply_file_edit(file, edit)
+
+    apply_file_edit(file, edit.inverse())
+
+    assert file.content == CONTENT
+    assert snapshot(file.tasks) == snapshot(parse_file_tasks(CONTENT))
+
+
+def test_stale_file_is_parsed_in_full(tmp_path):
+    executor = ActionExecutor(str(tmp_path))
+    (edit,) = executor.plan_edits(
+        confirm_all_actions()[:3], {"Project.md": CONTENT}
+    )
+    # Loaded before an outside change, so the edit's line numbers do not apply
+    file = load(CONTENT.replace("## Tasks\n", "## Tasks\n\n\n"))
+
+    apply_file_edit(file, edit)
+
+    assert snapshot(file.tasks) == snapshot(parse_file_tasks(edit.after))
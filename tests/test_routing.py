@@ -0,0 +1,205 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from obsidian_debrief.utils.routing import EndpointConfig, EndpointPool
+
+
+class StubClient:
+    """Stands in for an OpenAI client; handler(kwargs) plays the server"""
+
+    def __init__(self, name, handler):
+        self.name = name
+        self.handler = handler
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self.handler(kwargs)
+            return self.name
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def ok(kwargs):
+    pass
+
+
+def connection_error(kwargs):
+    raise openai.APIConnectionError(request=httpx.Request("POST", "http://stub/v1"))
+
+
+def make_pool(handlers, max_concurrency=2, health=None, **kwargs):
+    clients = {}
+
+    def client_factory(endpoint):
+        name = endpoint.base_url
+        clients[name] = StubClient(name, handlers[name])
+        return clients[name]
+
+    def health_check(endpoint, timeout):
+        return health(endpoint.base_url) if health else True
+
+    pool = EndpointPool(
+        [
+            EndpointConfig(base_url=name, max_concurrency=max_concurrency)
+            for name in handlers
+        ],
+        client_factory=client_factory,
+        health_check=health_check,
+        **kwargs,
+    )
+    return pool, clients
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_routes_to_least_outstanding_endpoint():
+    release = threading.Event()
+    pool, clients = make_pool({"a": lambda kw: release.wait(2), "b": ok})
+
+    worker = threading.Thread(target=pool.create, kwargs={"messages": []})
+    worker.start()
+    wait_for(lambda: clients["a"].active == 1)
+
+    # a has a request in flight, b has none
+    assert pool.create(messages=[]) == "b"
+    release.set()
+    worker.join()
+    pool.shutdown()
+
+
+def test_respects_per_endpoint_concurrency():
+    pool, clients = make_pool(
+        {"a": lambda kw: time.sleep(0.05), "b": lambda kw: time.sleep(0.05)},
+        max_concurrency=1,
+    )
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(pool.create(messages=[])))
+        for _ in range(6)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(results) == 6
+    assert clients["a"].max_active == 1
+    assert clients["b"].max_active == 1
+    assert clients["a"].calls + clients["b"].calls == 6
+    pool.shutdown()
+
+
+def test_fails_over_on_connection_error():
+    pool, clients = make_pool({"a": connection_error, "b": ok})
+
+    assert pool.create(messages=[]) == "b"
+    assert not pool.endpoints[0].healthy
+    # a stays out of rotation during its backoff
+    assert pool.create(messages=[]) == "b"
+    assert clients["a"].calls == 1
+    pool.shutdown()
+
+
+def test_fails_over_on_server_error():
+    def server_error(kwargs):
+        request = httpx.Request("POST", "http://stub/v1")
+        raise openai.InternalServerError(
+            "boom", response=httpx.Response(503, request=request), body=None
+        )
+
+    pool, _ = make_pool({"a": server_error, "b": ok})
+    assert pool.create(messages=[]) == "b"
+    assert not pool.endpoints[0].healthy
+    pool.shutdown()
+
+
+def test_bad_generation_does_not_fail_over():
+    def invalid_output(kwargs):
+        raise ValueError("response failed validation")
+
+    pool, clients = make_pool({"a": invalid_output, "b": ok})
+
+    with pytest.raises(ValueError):
+        pool.create(messages=[])
+    assert pool.endpoints[0].healthy
+    assert clients["b"].calls == 0
+    pool.shutdown()
+
+
+def test_hedges_past_latency_percentile():
+    release = threading.Event()
+    pool, clients = make_pool(
+        {"a": lambda kw: release.wait(2), "b": ok},
+        hedge_percentile=50,
+        min_hedge_samples=4,
+    )
+    for endpoint in pool.endpoints:
+        endpoint.latencies.extend([0.01, 0.01, 0.02, 0.02])
+
+    start = time.perf_counter()
+    assert pool.create(messages=[]) == "b"
+    assert time.perf_counter() - start < 1
+    assert pool.hedged_requests == 1
+    assert clients["a"].calls == 1
+    release.set()
+    pool.shutdown()
+
+
+def test_no_hedge_without_enough_samples():
+    pool, _ = make_pool(
+        {"a": lambda kw: time.sleep(0.05), "b": ok},
+        hedge_percentile=50,
+        min_hedge_samples=4,
+    )
+    assert pool.create(messages=[]) == "a"
+    assert pool.hedged_requests == 0
+    pool.shutdown()
+
+
+def test_readmits_endpoint_only_after_health_check():
+    healthy = {"a": False}
+    checks = []
+
+    def health(name):
+        checks.append(name)
+        return healthy[name]
+
+    failures = iter([connection_error])
+    pool, clients = make_pool(
+        {"a": lambda kw: next(failures, ok)(kw), "b": ok},
+        health=health,
+        unhealthy_backoff=0.0,
+    )
+
+    assert pool.create(messages=[]) == "b"
+    # Backoff expired but the probe fails, so a stays down
+    assert pool.create(messages=[]) == "b"
+    assert checks and set(checks) == {"a"}
+    assert clients["a"].calls == 1
+    assert not pool.endpoints[0].healthy
+
+    healthy["a"] = True
+    pool.endpoints[1].outstanding = 1  # make b the busier endpoint
+    assert pool.create(messages=[]) == "a"
+    assert pool.endpoints[0].healthy
+    pool.shutdown()